@@ -1,9 +1,8 @@
-from time import sleep
-from typing import Dict, Tuple
+from typing import TYPE_CHECKING, Dict, List, Tuple, Union, Callable, Optional
 from pathlib import Path
 from tkinter import Tk, Event, Canvas, PhotoImage, messagebox
-
-from PIL import Image, ImageTk
+from threading import Event as StopEvent
+from concurrent.futures import Future, ThreadPoolExecutor
 
 from checkers import (
     BLACK_CHECKERS,
@@ -13,9 +12,17 @@ from checkers import (
     Position,
     SideType,
     CheckerType,
+    TranspositionTable,
+    PieceSquareEvaluator,
 )
+from checkers.book import OpeningBook
+from checkers.tablebase import Tablebase
 
 from .config import get_colors, get_app_config, get_render_params
+from .sprites import load_sprite
+
+if TYPE_CHECKING:
+    from PIL import ImageTk
 
 APP_CONFIG = get_app_config()
 RENDER_PARAMS = get_render_params()
@@ -38,19 +45,50 @@ class App:
 
         self.__canvas.bind("<Motion>", self.__handle_mouse_move)
         self.__canvas.bind("<Button-1>", self.__handle_mouse_clicked)
+        self.__window.protocol("WM_DELETE_WINDOW", self.__close)
 
-        self.__images: Dict[CheckerType, ImageTk.PhotoImage]
+        # Sprites are loaded on first use and kept for all games of the window
+        self.__images: Dict[CheckerType, Union[PhotoImage, "ImageTk.PhotoImage"]] = {}
         self.__player_turn: bool
         self.__hovered_cell: Position
         self.__selected_cell: Position
         self.__animated_cell: Position
         self.__board: Board
-
+        # Canvas items are created once, every square keeps its items and the look
+        # they were last drawn with, as (border color, move hint, checker type)
+        self.__border_items: Dict[Position, int] = {}
+        self.__hint_items: Dict[Position, int] = {}
+        self.__checker_items: Dict[Position, int] = {}
+        self.__drawn: Dict[Position, Tuple[str, bool, CheckerType]] = {}
+        self.__table = TranspositionTable(APP_CONFIG.TRANSPOSITION_TABLE_SIZE)
+        self.__book: Optional[OpeningBook] = None
+        if Path("assets", APP_CONFIG.OPENING_BOOK).exists():
+            self.__book = OpeningBook(Path("assets", APP_CONFIG.OPENING_BOOK))
+        self.__tablebase: Optional[Tablebase] = None
+        if Path("assets", APP_CONFIG.TABLEBASE).exists():
+            self.__tablebase = Tablebase(Path("assets", APP_CONFIG.TABLEBASE))
+        # Opponent thinks in the background, its board is a copy of the game one
+        self.__executor = ThreadPoolExecutor(max_workers=1)
+        self.__search: Optional[Future[List[Move]]] = None
+        self.__stop_search = StopEvent()
+        # While the player thinks, the opponent searches its answers to the likely player
+        # turns, found moves are kept by position hash until the player moves
+        self.__ponder: Optional[Future[None]] = None
+        self.__stop_ponder = StopEvent()
+        self.__pondered: Dict[int, List[Move]] = {}
+
+        self.__create_items()
         self.__setup()
 
     def mainloop(self) -> None:
         self.__window.mainloop()
 
+    def __close(self) -> None:
+        self.__cancel_search()
+        self.__cancel_ponder()
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+        self.__window.destroy()
+
     def __handle_mouse_move(self, event: Event) -> None:
         x, y = event.x // RENDER_PARAMS.CELL_SIZE, event.y // RENDER_PARAMS.CELL_SIZE
         if x != self.__hovered_cell.x or y != self.__hovered_cell.y:
@@ -79,13 +117,9 @@ class App:
             self.__selected_cell = Position(x, y)
             self.__draw()
         elif self.__player_turn:
-            move = Move(
-                Position(self.__selected_cell.x, self.__selected_cell.y), Position(x, y)
-            )
-            if move in self.__board.get_moves(APP_CONFIG.PLAYER_SIDE):
-                self.__handle_player_turn(move)
-                if not self.__player_turn:
-                    self.__handle_opponent_turn()
+            destinations = self.__board.get_move_destinations(APP_CONFIG.PLAYER_SIDE)
+            if Position(x, y) in destinations.get(self.__selected_cell, ()):
+                self.__handle_player_turn(Move(self.__selected_cell, Position(x, y)))
 
     def __setup(self) -> None:
         self.__board = Board(RENDER_PARAMS.X_SIZE, RENDER_PARAMS.Y_SIZE)
@@ -93,165 +127,248 @@ class App:
         self.__hovered_cell = Position()
         self.__selected_cell = Position()
         self.__animated_cell = Position()
+        self.__cancel_search()
+        self.__cancel_ponder()
+        self.__pondered = {}
+        self.__table.clear()
 
-        self.__init_images()
         self.__draw()
 
         if APP_CONFIG.PLAYER_SIDE == SideType.BLACK:
             self.__handle_opponent_turn()
+        else:
+            self.__board.record_position(APP_CONFIG.PLAYER_SIDE)
+            self.__start_ponder()
 
-    def __init_images(self) -> None:
-        self.__images = {
-            CheckerType.WHITE_MAN: ImageTk.PhotoImage(
-                Image.open(Path("assets", "white-man.png")).resize(
-                    (RENDER_PARAMS.CELL_SIZE, RENDER_PARAMS.CELL_SIZE),
-                    Image.Resampling.LANCZOS,
-                )
-            ),
-            CheckerType.BLACK_MAN: ImageTk.PhotoImage(
-                Image.open(Path("assets", "black-man.png")).resize(
-                    (RENDER_PARAMS.CELL_SIZE, RENDER_PARAMS.CELL_SIZE),
-                    Image.Resampling.LANCZOS,
-                )
-            ),
-            CheckerType.WHITE_KING: ImageTk.PhotoImage(
-                Image.open(Path("assets", "white-king.png")).resize(
-                    (RENDER_PARAMS.CELL_SIZE, RENDER_PARAMS.CELL_SIZE),
-                    Image.Resampling.LANCZOS,
-                )
-            ),
-            CheckerType.BLACK_KING: ImageTk.PhotoImage(
-                Image.open(Path("assets", "black-king.png")).resize(
-                    (RENDER_PARAMS.CELL_SIZE, RENDER_PARAMS.CELL_SIZE),
-                    Image.Resampling.LANCZOS,
-                )
-            ),
-        }
+    def __image(self, type: CheckerType) -> Union[PhotoImage, "ImageTk.PhotoImage", str]:
+        if type == CheckerType.NONE:
+            return ""
+        if type not in self.__images:
+            self.__images[type] = load_sprite(type, RENDER_PARAMS.CELL_SIZE)
+        return self.__images[type]
+
+    def __create_items(self) -> None:
+        board_colors = [COLORS.BOARD_COLORS.Light, COLORS.BOARD_COLORS.Dark]
+        cell_size = RENDER_PARAMS.CELL_SIZE
+        border_offset = RENDER_PARAMS.BORDER_WIDTH // 2
+        positions = [
+            Position(x, y)
+            for y in range(RENDER_PARAMS.Y_SIZE)
+            for x in range(RENDER_PARAMS.X_SIZE)
+        ]
+        for position in positions:
+            left, top = position.x * cell_size, position.y * cell_size
+            self.__canvas.create_rectangle(
+                left,
+                top,
+                left + cell_size,
+                top + cell_size,
+                fill=board_colors[(position.y + position.x) % 2],
+                width=0,
+            )
+            self.__border_items[position] = self.__canvas.create_rectangle(
+                left + border_offset,
+                top + border_offset,
+                left + cell_size - border_offset,
+                top + cell_size - border_offset,
+                width=RENDER_PARAMS.BORDER_WIDTH,
+                state="hidden",
+            )
+            self.__hint_items[position] = self.__canvas.create_oval(
+                left + cell_size / 3,
+                top + cell_size / 3,
+                left + (cell_size - cell_size / 3),
+                top + (cell_size - cell_size / 3),
+                fill=COLORS.POSSIBLE_MOVE_COLOR,
+                width=0,
+                state="hidden",
+            )
+        # Checkers are above all squares
+        for position in positions:
+            self.__checker_items[position] = self.__canvas.create_image(
+                position.x * cell_size,
+                position.y * cell_size,
+                anchor="nw",
+                tag="checkers",
+            )
 
     def __draw(self) -> None:
-        self.__canvas.delete("all")
-        self.__draw_board_grid()
-        self.__draw_checkers()
+        # Only squares which look differently since the last draw are updated
+        destinations = self.__board.get_move_destinations(APP_CONFIG.PLAYER_SIDE).get(
+            self.__selected_cell, frozenset()
+        )
+        for position, checker_item in self.__checker_items.items():
+            if position == self.__selected_cell:
+                border = COLORS.SELECT_BORDER_COLOR
+            elif position == self.__hovered_cell:
+                border = COLORS.HOVER_BORDER_COLOR
+            else:
+                border = ""
+            if position == self.__animated_cell:
+                type = CheckerType.NONE
+            else:
+                type = self.__board.type_at(position.x, position.y)
+            look = (border, position in destinations, type)
+            if self.__drawn.get(position) == look:
+                continue
+            self.__drawn[position] = look
+
+            self.__canvas.itemconfigure(
+                self.__border_items[position],
+                outline=border,
+                state="normal" if border else "hidden",
+            )
+            self.__canvas.itemconfigure(
+                self.__hint_items[position],
+                state="normal" if position in destinations else "hidden",
+            )
+            self.__canvas.itemconfigure(checker_item, image=self.__image(type))
 
     def __handle_player_turn(self, move: Move) -> None:
         self.__player_turn = False
-        has_killed_checker = self.__handle_move(move)
-        required_moves = list(
-            filter(
-                lambda req: move.to.x == req.from_.x and move.to.y == req.from_.y,
-                self.__board.get_required_moves(APP_CONFIG.PLAYER_SIDE),
-            )
+        self.__selected_cell = Position()
+        self.__handle_move(
+            move, lambda has_killed: self.__finish_player_turn(move, has_killed)
         )
+
+    def __finish_player_turn(self, move: Move, has_killed_checker: bool) -> None:
+        required_moves = self.__board.get_required_moves_from(move.to)
         if has_killed_checker and required_moves:
             self.__player_turn = True
-        self.__selected_cell = Position()
+        else:
+            self.__handle_opponent_turn()
 
     def __handle_opponent_turn(self) -> None:
         self.__player_turn = False
-        optimal_move = self.__board.get_optimal_move(
-            SideType.opposite(APP_CONFIG.PLAYER_SIDE), APP_CONFIG.MAX_PREDICTION_DEPTH
+        side = SideType.opposite(APP_CONFIG.PLAYER_SIDE)
+        self.__board.record_position(side)
+        if self.__board.is_draw:
+            self.__check_game_over()
+            return
+        pondered = self.__pondered.get(self.__board.position_hash(side))
+        self.__cancel_ponder()
+        if pondered is not None:
+            self.__handle_opponent_moves(pondered)
+            return
+
+        # Pondering warmed the table up even when the player made an unexpected turn
+        self.__stop_search = StopEvent()
+        self.__search = self.__executor.submit(
+            Board.copy(self.__board).get_optimal_move,
+            side,
+            APP_CONFIG.MAX_PREDICTION_DEPTH,
+            APP_CONFIG.MAX_THINKING_TIME,
+            self.__table,
+            book=self.__book,
+            tablebase=self.__tablebase,
+            stop=self.__stop_search,
+        )
+        self.__window.after(
+            APP_CONFIG.SEARCH_POLL_INTERVAL, self.__poll_search, self.__search
         )
-        for move in optimal_move:
-            self.__handle_move(move)
-        self.__player_turn = True
-        self.__check_game_over()
 
-    def __draw_board_grid(self) -> None:
-        board_colors = [COLORS.BOARD_COLORS.Light, COLORS.BOARD_COLORS.Dark]
-        for y in range(self.__board.y_size):
-            for x in range(self.__board.x_size):
-                self.__canvas.create_rectangle(
-                    x * RENDER_PARAMS.CELL_SIZE,
-                    y * RENDER_PARAMS.CELL_SIZE,
-                    x * RENDER_PARAMS.CELL_SIZE + RENDER_PARAMS.CELL_SIZE,
-                    y * RENDER_PARAMS.CELL_SIZE + RENDER_PARAMS.CELL_SIZE,
-                    fill=board_colors[(y + x) % 2],
-                    width=0,
-                )
-
-                if x == self.__selected_cell.x and y == self.__selected_cell.y:
-                    self.__canvas.create_rectangle(
-                        x * RENDER_PARAMS.CELL_SIZE + RENDER_PARAMS.BORDER_WIDTH // 2,
-                        y * RENDER_PARAMS.CELL_SIZE + RENDER_PARAMS.BORDER_WIDTH // 2,
-                        x * RENDER_PARAMS.CELL_SIZE
-                        + RENDER_PARAMS.CELL_SIZE
-                        - RENDER_PARAMS.BORDER_WIDTH // 2,
-                        y * RENDER_PARAMS.CELL_SIZE
-                        + RENDER_PARAMS.CELL_SIZE
-                        - RENDER_PARAMS.BORDER_WIDTH // 2,
-                        outline=COLORS.SELECT_BORDER_COLOR,
-                        width=RENDER_PARAMS.BORDER_WIDTH,
-                    )
-                elif x == self.__hovered_cell.x and y == self.__hovered_cell.y:
-                    self.__canvas.create_rectangle(
-                        x * RENDER_PARAMS.CELL_SIZE + RENDER_PARAMS.BORDER_WIDTH // 2,
-                        y * RENDER_PARAMS.CELL_SIZE + RENDER_PARAMS.BORDER_WIDTH // 2,
-                        x * RENDER_PARAMS.CELL_SIZE
-                        + RENDER_PARAMS.CELL_SIZE
-                        - RENDER_PARAMS.BORDER_WIDTH // 2,
-                        y * RENDER_PARAMS.CELL_SIZE
-                        + RENDER_PARAMS.CELL_SIZE
-                        - RENDER_PARAMS.BORDER_WIDTH // 2,
-                        outline=COLORS.HOVER_BORDER_COLOR,
-                        width=RENDER_PARAMS.BORDER_WIDTH,
-                    )
-
-                if self.__selected_cell:
-                    player_moves_list = self.__board.get_moves(APP_CONFIG.PLAYER_SIDE)
-                    for move in player_moves_list:
-                        if (
-                            self.__selected_cell.x == move.from_.x
-                            and self.__selected_cell.y == move.from_.y
-                        ):
-                            self.__canvas.create_oval(
-                                move.to.x * RENDER_PARAMS.CELL_SIZE
-                                + RENDER_PARAMS.CELL_SIZE / 3,
-                                move.to.y * RENDER_PARAMS.CELL_SIZE
-                                + RENDER_PARAMS.CELL_SIZE / 3,
-                                move.to.x * RENDER_PARAMS.CELL_SIZE
-                                + (RENDER_PARAMS.CELL_SIZE - RENDER_PARAMS.CELL_SIZE / 3),
-                                move.to.y * RENDER_PARAMS.CELL_SIZE
-                                + (RENDER_PARAMS.CELL_SIZE - RENDER_PARAMS.CELL_SIZE / 3),
-                                fill=COLORS.POSSIBLE_MOVE_COLOR,
-                                width=0,
-                            )
-
-    def __draw_checkers(self) -> None:
-        for y in range(self.__board.y_size):
-            for x in range(self.__board.x_size):
-                if self.__board.type_at(x, y) != CheckerType.NONE and not (
-                    x == self.__animated_cell.x and y == self.__animated_cell.y
-                ):
-                    self.__canvas.create_image(
-                        x * RENDER_PARAMS.CELL_SIZE,
-                        y * RENDER_PARAMS.CELL_SIZE,
-                        image=self.__images.get(self.__board.type_at(x, y)),
-                        anchor="nw",
-                        tag="checkers",
-                    )
-
-    def __handle_move(self, move: Move) -> bool:
-        self.__animate_move(move)
-        has_killed = self.__board.handle_move(move)
-        self.__draw()
-        return has_killed
+    def __poll_search(self, search: Future[List[Move]]) -> None:
+        # Result of a cancelled search is dropped
+        if search is not self.__search:
+            return
+        if not search.done():
+            self.__window.after(
+                APP_CONFIG.SEARCH_POLL_INTERVAL, self.__poll_search, search
+            )
+            return
+        self.__search = None
+        self.__handle_opponent_moves(search.result())
+
+    def __handle_opponent_moves(self, moves: List[Move]) -> None:
+        if not moves:
+            self.__player_turn = True
+            self.__board.record_position(APP_CONFIG.PLAYER_SIDE)
+            self.__start_ponder()
+            self.__check_game_over()
+            return
+        self.__handle_move(moves[0], lambda _: self.__handle_opponent_moves(moves[1:]))
+
+    def __cancel_search(self) -> None:
+        if self.__search is not None:
+            self.__stop_search.set()
+            self.__search.cancel()
+            self.__search = None
+
+    def __start_ponder(self) -> None:
+        self.__cancel_ponder()
+        self.__pondered = {}
+        if APP_CONFIG.PONDER:
+            self.__stop_ponder = StopEvent()
+            self.__ponder = self.__executor.submit(
+                self.__ponder_replies,
+                Board.copy(self.__board),
+                self.__pondered,
+                self.__stop_ponder,
+            )
+
+    def __ponder_replies(
+        self, board: Board, pondered: Dict[int, List[Move]], stop: StopEvent
+    ) -> None:
+        # Runs in the search thread, player turns which look best for the player are
+        # answered first, results of stopped searches are dropped
+        side = SideType.opposite(APP_CONFIG.PLAYER_SIDE)
+        evaluator = PieceSquareEvaluator()
+        turns = []
+        for sequence in board.get_move_sequences(APP_CONFIG.PLAYER_SIDE):
+            undo = board.make_sequence(sequence)
+            turns.append((evaluator.evaluate(board, side), sequence))
+            board.unmake_move(undo)
+        turns.sort(key=lambda turn: turn[0])
+
+        for _, sequence in turns[: APP_CONFIG.PONDER_TURNS or len(turns)]:
+            if stop.is_set():
+                return
+            undo = board.make_sequence(sequence)
+            moves = board.get_optimal_move(
+                side,
+                APP_CONFIG.MAX_PREDICTION_DEPTH,
+                APP_CONFIG.MAX_THINKING_TIME,
+                self.__table,
+                book=self.__book,
+                tablebase=self.__tablebase,
+                stop=stop,
+            )
+            if not stop.is_set():
+                pondered[board.position_hash(side)] = moves
+            board.unmake_move(undo)
+
+    def __cancel_ponder(self) -> None:
+        if self.__ponder is not None:
+            self.__stop_ponder.set()
+            self.__ponder.cancel()
+            self.__ponder = None
+
+    def __handle_move(self, move: Move, on_done: Callable[[bool], None]) -> None:
+        def finish() -> None:
+            has_killed = self.__board.handle_move(move)
+            self.__draw()
+            on_done(has_killed)
+
+        self.__animate_move(move, finish)
 
     def __check_game_over(self) -> None:
         game_over, side = self.__board.is_game_over()
         if game_over:
-            messagebox.showinfo(
-                "Game Over", "White Wins" if side == SideType.WHITE else "Black Wins"
-            )
+            if side is None:
+                message = "Draw"
+            else:
+                message = "White Wins" if side == SideType.WHITE else "Black Wins"
+            messagebox.showinfo("Game Over", message)
             self.__setup()
 
-    def __animate_move(self, move: Move) -> None:
+    def __animate_move(self, move: Move, on_done: Callable[[], None]) -> None:
         self.__animated_cell = Position(move.from_.x, move.from_.y)
         self.__draw()
 
         animated_checker = self.__canvas.create_image(
             move.from_.x * RENDER_PARAMS.CELL_SIZE,
             move.from_.y * RENDER_PARAMS.CELL_SIZE,
-            image=self.__images.get(self.__board.type_at(move.from_.x, move.from_.y)),
+            image=self.__image(self.__board.type_at(move.from_.x, move.from_.y)),
             anchor="nw",
             tag="animated_checker",
         )
@@ -259,14 +376,35 @@ class App:
         dx = 1 if move.from_.x < move.to.x else -1
         dy = 1 if move.from_.y < move.to.y else -1
 
-        for _ in range(abs(move.from_.x - move.to.x)):
-            for _ in range(100 // RENDER_PARAMS.ANIMATION_VELOCITY):
-                self.__canvas.move(
-                    animated_checker,
-                    RENDER_PARAMS.ANIMATION_VELOCITY / 100 * RENDER_PARAMS.CELL_SIZE * dx,
-                    RENDER_PARAMS.ANIMATION_VELOCITY / 100 * RENDER_PARAMS.CELL_SIZE * dy,
-                )
-                self.__canvas.update()
-                sleep(0.01)
+        self.__animate_step(
+            animated_checker,
+            RENDER_PARAMS.ANIMATION_VELOCITY / 100 * RENDER_PARAMS.CELL_SIZE * dx,
+            RENDER_PARAMS.ANIMATION_VELOCITY / 100 * RENDER_PARAMS.CELL_SIZE * dy,
+            abs(move.from_.x - move.to.x) * (100 // RENDER_PARAMS.ANIMATION_VELOCITY),
+            on_done,
+        )
 
-        self.__animated_cell = Position()
+    def __animate_step(
+        self,
+        animated_checker: int,
+        dx: float,
+        dy: float,
+        steps: int,
+        on_done: Callable[[], None],
+    ) -> None:
+        # Every frame is scheduled on the Tk event loop, so input is handled in between
+        if steps <= 0:
+            self.__canvas.delete(animated_checker)
+            self.__animated_cell = Position()
+            on_done()
+            return
+        self.__canvas.move(animated_checker, dx, dy)
+        self.__window.after(
+            RENDER_PARAMS.ANIMATION_FRAME_TIME,
+            self.__animate_step,
+            animated_checker,
+            dx,
+            dy,
+            steps - 1,
+            on_done,
+        )
@@ -12,6 +12,14 @@ class AppConfig(NamedTuple):
     WINDOW_TITLE: str = "Checkers"
     PLAYER_SIDE: SideType = SideType.WHITE  # side which players starts
     MAX_PREDICTION_DEPTH: int = 3  # number of steps that count
+    MAX_THINKING_TIME: int = 2000  # in ms, search stops deepening after it
+    TRANSPOSITION_TABLE_SIZE: int = 16  # in MB
+    OPENING_BOOK: str = "book.bin"  # in assets, used when the file exists
+    TABLEBASE: str = "tablebase.bin"  # in assets, used when the file exists
+    SPRITE_CACHE: str = "sprites"  # in assets, resized checker images, empty disables
+    SEARCH_POLL_INTERVAL: int = 20  # in ms, how often the UI checks the opponent search
+    PONDER: bool = True  # opponent searches during the player turn
+    PONDER_TURNS: int = 4  # number of the likeliest player turns to answer, 0 is all
 
 
 class RenderParams(NamedTuple):
@@ -19,6 +27,7 @@ class RenderParams(NamedTuple):
     Y_SIZE: int = 8
     CELL_SIZE: int = 74  # in px
     ANIMATION_VELOCITY: int = 4  # grater = faster
+    ANIMATION_FRAME_TIME: int = 10  # in ms
     BORDER_WIDTH: int = 2 * 2  # preferably it should be even
 
 
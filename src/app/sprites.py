@@ -0,0 +1,44 @@
+from typing import TYPE_CHECKING, Dict, Union
+from pathlib import Path
+from tkinter import PhotoImage
+
+from checkers import CheckerType
+
+from .config import get_app_config
+
+if TYPE_CHECKING:
+    from PIL import ImageTk
+
+APP_CONFIG = get_app_config()
+
+# Image of every checker type in assets
+SPRITES: Dict[CheckerType, str] = {
+    CheckerType.WHITE_MAN: "white-man.png",
+    CheckerType.BLACK_MAN: "black-man.png",
+    CheckerType.WHITE_KING: "white-king.png",
+    CheckerType.BLACK_KING: "black-king.png",
+}
+
+
+def load_sprite(
+    type: CheckerType, cell_size: int
+) -> Union[PhotoImage, "ImageTk.PhotoImage"]:
+    # Resized images are kept on disk by cell size and read by Tk itself, so PIL is
+    # imported only when a sprite is resized for the first time
+    name = SPRITES[type]
+    cached = Path("assets", APP_CONFIG.SPRITE_CACHE, str(cell_size), name)
+    if APP_CONFIG.SPRITE_CACHE and cached.exists():
+        return PhotoImage(file=cached)
+
+    from PIL import Image, ImageTk
+
+    image = Image.open(Path("assets", name)).resize(
+        (cell_size, cell_size), Image.Resampling.LANCZOS
+    )
+    if APP_CONFIG.SPRITE_CACHE:
+        try:
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            image.save(cached)
+        except OSError:
+            pass
+    return ImageTk.PhotoImage(image)
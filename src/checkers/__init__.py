@@ -1,15 +1,26 @@
 from .side import SideType
 from .position import Position
-from .move import Move
+from .move import Move, UndoInfo, MoveSequence
 from .checker import CheckerType, WHITE_CHECKERS, BLACK_CHECKERS
 from .board import Board
+from .bitboard import BitBoard
+from .evaluation import Evaluator, MaterialEvaluator, PieceSquareEvaluator
+from .transposition import Bound, TranspositionTable
 
 __all__ = [
+    "BitBoard",
     "Board",
+    "Bound",
     "CheckerType",
+    "Evaluator",
+    "MaterialEvaluator",
     "Move",
+    "MoveSequence",
+    "PieceSquareEvaluator",
     "Position",
     "SideType",
+    "TranspositionTable",
+    "UndoInfo",
     "BLACK_CHECKERS",
     "WHITE_CHECKERS",
 ]
@@ -0,0 +1,188 @@
+from typing import Dict, List, Tuple, Sequence
+
+try:
+    import numpy as np
+except ImportError as error:  # numpy is needed only by this module
+    raise ImportError("checkers.batch requires numpy: pip install numpy") from error
+
+from .side import SideType
+from .board import Board
+from .checker import KING_SCORE, CheckerType
+from .position import MOVE_OFFSETS
+from .evaluation import MAN_VALUE, TEMPO_BONUS, MOBILITY_BONUS, get_piece_square_tables
+
+# Value of every checker type in a packed array, white checkers are positive
+VALUES: Dict[CheckerType, int] = {
+    CheckerType.NONE: 0,
+    CheckerType.WHITE_MAN: 1,
+    CheckerType.WHITE_KING: 2,
+    CheckerType.BLACK_MAN: -1,
+    CheckerType.BLACK_KING: -2,
+}
+# Order of checker types in counts and of bitboard masks in packing
+TYPES: Tuple[CheckerType, ...] = (
+    CheckerType.WHITE_MAN,
+    CheckerType.WHITE_KING,
+    CheckerType.BLACK_MAN,
+    CheckerType.BLACK_KING,
+)
+
+
+def pack(boards: Sequence[Board]) -> np.ndarray:
+    # Boards of the same size to an (N, y_size, x_size) int8 array
+    if not boards:
+        return np.zeros((0, 0, 0), dtype=np.int8)
+    x_size, y_size = boards[0].x_size, boards[0].y_size
+    squares = x_size * y_size
+    width = (squares + 7) // 8
+    masks = b"".join(
+        mask.to_bytes(width, "little")
+        for board in boards
+        for mask in (
+            board.bitboard.white_men,
+            board.bitboard.white_kings,
+            board.bitboard.black_men,
+            board.bitboard.black_kings,
+        )
+    )
+    bits = np.unpackbits(
+        np.frombuffer(masks, dtype=np.uint8).reshape(len(boards), len(TYPES), width),
+        axis=-1,
+        bitorder="little",
+    )[..., :squares].astype(np.int8)
+    weights = np.array([VALUES[type] for type in TYPES], dtype=np.int8)
+    packed: np.ndarray = np.einsum("nts,t->ns", bits, weights).astype(np.int8)
+    return packed.reshape(len(boards), y_size, x_size)
+
+
+def unpack(array: np.ndarray) -> List[Board]:
+    count, y_size, x_size = array.shape
+    flat = array.reshape(count, -1)
+    masks = [
+        np.packbits(flat == VALUES[type], axis=-1, bitorder="little") for type in TYPES
+    ]
+    return [
+        Board.from_bitboards(
+            x_size,
+            y_size,
+            *(int.from_bytes(mask[i].tobytes(), "little") for mask in masks),
+        )
+        for i in range(count)
+    ]
+
+
+def counts(array: np.ndarray) -> np.ndarray:
+    # (N, 4) numbers of white men, white kings, black men and black kings
+    result: np.ndarray = np.stack(
+        [np.count_nonzero(array == VALUES[type], axis=(1, 2)) for type in TYPES], axis=1
+    )
+    return result
+
+
+def material_scores(array: np.ndarray, side: SideType = SideType.WHITE) -> np.ndarray:
+    # Same as MaterialEvaluator for every board
+    white_men, white_kings, black_men, black_kings = counts(array).T
+    score: np.ndarray = MAN_VALUE * (
+        white_men + KING_SCORE * white_kings - black_men - KING_SCORE * black_kings
+    )
+    return score if side == SideType.WHITE else -score
+
+
+def piece_square_scores(array: np.ndarray) -> np.ndarray:
+    # Same as Board.piece_square_score for every board, values of all squares are
+    # looked up at once in tables indexed by packed value and square
+    count, y_size, x_size = array.shape
+    tables = get_piece_square_tables(x_size, y_size)
+    lookup = np.zeros((len(VALUES), x_size * y_size), dtype=np.int64)
+    for type, value in VALUES.items():
+        lookup[value] = tables[type]
+    squares = np.arange(x_size * y_size)
+    score: np.ndarray = lookup[array.reshape(count, -1), squares].sum(axis=1)
+    return score
+
+
+def evaluate(array: np.ndarray, side: SideType) -> np.ndarray:
+    # Same as PieceSquareEvaluator for every board with the side to move
+    mobility = _mobility(array, SideType.WHITE) - _mobility(array, SideType.BLACK)
+    score: np.ndarray = piece_square_scores(array) + MOBILITY_BONUS * mobility
+    return TEMPO_BONUS + (score if side == SideType.WHITE else -score)
+
+
+def capture_masks(array: np.ndarray, side: SideType) -> np.ndarray:
+    # (N, y_size, x_size) squares of the side checkers which can capture
+    sign = 1 if side == SideType.WHITE else -1
+    kings = array == sign * VALUES[CheckerType.WHITE_KING]
+    movers = kings | (array == sign * VALUES[CheckerType.WHITE_MAN])
+    captures = _captures(array, movers, kings, sign, 1)
+    # Rays of kings are followed only on boards with kings
+    boards = np.flatnonzero(np.count_nonzero(kings, axis=(1, 2)))
+    if len(boards):
+        captures[boards] |= _captures(
+            array[boards], kings[boards], kings[boards], sign, max(array.shape[1:]) - 2
+        )
+    return captures
+
+
+def has_captures(array: np.ndarray, side: SideType) -> np.ndarray:
+    # (N,) whether the side has to capture on every board
+    result: np.ndarray = np.count_nonzero(capture_masks(array, side), axis=(1, 2)) > 0
+    return result
+
+
+def _captures(
+    array: np.ndarray, movers: np.ndarray, kings: np.ndarray, sign: int, steps: int
+) -> np.ndarray:
+    # Movers which can capture a checker at most the given steps away
+    opponent = array * sign < 0
+    empty = array == 0
+    captures = np.zeros(array.shape, dtype=bool)
+    for offset in MOVE_OFFSETS:
+        # Checkers which reach the square at the step distance over empty squares
+        reaching = movers
+        for step in range(1, steps + 1):
+            sources = _region(array.shape, offset.x, offset.y, step + 1)
+            jumped = _region(array.shape, offset.x, offset.y, step + 1, step)
+            landing = _region(array.shape, offset.x, offset.y, step + 1, step + 1)
+            captures[sources] |= reaching[sources] & opponent[jumped] & empty[landing]
+            if step == steps:
+                break
+
+            sources = _region(array.shape, offset.x, offset.y, step)
+            targets = _region(array.shape, offset.x, offset.y, step, step)
+            next_reaching = np.zeros(array.shape, dtype=bool)
+            next_reaching[sources] = reaching[sources] & kings[sources] & empty[targets]
+            reaching = next_reaching
+            if not reaching.any():
+                break
+    return captures
+
+
+def _mobility(array: np.ndarray, side: SideType) -> np.ndarray:
+    # Same as BitBoard.mobility for every board
+    sign = 1 if side == SideType.WHITE else -1
+    kings = array == sign * VALUES[CheckerType.WHITE_KING]
+    movers = kings | (array == sign * VALUES[CheckerType.WHITE_MAN])
+    empty = array == 0
+    forward = -1 if side == SideType.WHITE else 1
+    mobility = np.zeros(len(array), dtype=np.int64)
+    for offset in MOVE_OFFSETS:
+        sources = _region(array.shape, offset.x, offset.y, 1)
+        targets = _region(array.shape, offset.x, offset.y, 1, 1)
+        checkers = movers if offset.y == forward else kings
+        mobility += np.count_nonzero(checkers[sources] & empty[targets], axis=(1, 2))
+    return mobility
+
+
+def _region(
+    shape: Tuple[int, ...], dx: int, dy: int, distance: int, shift: int = 0
+) -> Tuple[slice, slice, slice]:
+    # Slices of squares (x + shift * dx, y + shift * dy) for every square (x, y) whose
+    # square at the distance in the direction is on the board
+    _, y_size, x_size = shape
+    top, bottom = max(0, -dy * distance), y_size - max(0, dy * distance)
+    left, right = max(0, -dx * distance), x_size - max(0, dx * distance)
+    return (
+        slice(None),
+        slice(top + dy * shift, bottom + dy * shift),
+        slice(left + dx * shift, right + dx * shift),
+    )
@@ -0,0 +1,283 @@
+from typing import List, Tuple, Iterator
+
+from .side import SideType
+from .tables import BoardTables, get_board_tables
+from .checker import CheckerType
+
+
+def iter_bits(bits: int) -> Iterator[int]:
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def shift(bits: int, offset: int) -> int:
+    return bits << offset if offset > 0 else bits >> -offset
+
+
+class BitBoard:
+    def __init__(self, x_size: int, y_size: int) -> None:
+        self.__x_size = x_size
+        self.__y_size = y_size
+        self.__white_men = 0
+        self.__white_kings = 0
+        self.__black_men = 0
+        self.__black_kings = 0
+
+        self.__tables = get_board_tables(x_size, y_size)
+        self.__playable = self.__tables.playable
+        self.__shifts = self.__tables.shifts
+        self.__step_sources = self.__tables.step_sources
+        self.__jump_sources = self.__tables.jump_sources
+        # Rows where white and black men are promoted
+        row = (1 << x_size) - 1
+        self.__promotion_masks = (row, row << (y_size - 1) * x_size)
+
+    @property
+    def x_size(self) -> int:
+        return self.__x_size
+
+    @property
+    def y_size(self) -> int:
+        return self.__y_size
+
+    @property
+    def tables(self) -> BoardTables:
+        return self.__tables
+
+    @property
+    def playable(self) -> int:
+        return self.__playable
+
+    @property
+    def white_men(self) -> int:
+        return self.__white_men
+
+    @property
+    def white_kings(self) -> int:
+        return self.__white_kings
+
+    @property
+    def black_men(self) -> int:
+        return self.__black_men
+
+    @property
+    def black_kings(self) -> int:
+        return self.__black_kings
+
+    @property
+    def promotion_masks(self) -> Tuple[int, int]:
+        return self.__promotion_masks
+
+    @property
+    def white(self) -> int:
+        return self.__white_men | self.__white_kings
+
+    @property
+    def black(self) -> int:
+        return self.__black_men | self.__black_kings
+
+    @property
+    def empty(self) -> int:
+        return self.__playable & ~(self.white | self.black)
+
+    def index(self, x: int, y: int) -> int:
+        return y * self.__x_size + x
+
+    def coordinates(self, index: int) -> Tuple[int, int]:
+        position = self.__tables.positions[index]
+        return position.x, position.y
+
+    def copy_from(self, bitboard: "BitBoard") -> None:
+        self.load(
+            bitboard.white_men,
+            bitboard.white_kings,
+            bitboard.black_men,
+            bitboard.black_kings,
+        )
+
+    def load(
+        self, white_men: int, white_kings: int, black_men: int, black_kings: int
+    ) -> None:
+        self.__white_men = white_men
+        self.__white_kings = white_kings
+        self.__black_men = black_men
+        self.__black_kings = black_kings
+
+    def type_at(self, index: int) -> CheckerType:
+        bit = 1 << index
+        if self.__white_men & bit:
+            return CheckerType.WHITE_MAN
+        if self.__black_men & bit:
+            return CheckerType.BLACK_MAN
+        if self.__white_kings & bit:
+            return CheckerType.WHITE_KING
+        if self.__black_kings & bit:
+            return CheckerType.BLACK_KING
+        return CheckerType.NONE
+
+    def set(self, index: int, type: CheckerType) -> None:
+        bit = 1 << index
+        mask = ~bit
+        self.__white_men &= mask
+        self.__white_kings &= mask
+        self.__black_men &= mask
+        self.__black_kings &= mask
+        match type:
+            case CheckerType.WHITE_MAN:
+                self.__white_men |= bit
+            case CheckerType.WHITE_KING:
+                self.__white_kings |= bit
+            case CheckerType.BLACK_MAN:
+                self.__black_men |= bit
+            case CheckerType.BLACK_KING:
+                self.__black_kings |= bit
+
+    def required_moves(self, side: SideType) -> List[Tuple[int, int]]:
+        men, kings, opponent = self.__side_masks(side)
+        empty = self.empty
+        moves: List[Tuple[int, int]] = []
+
+        for s, step_sources, jump_sources in zip(
+            self.__shifts, self.__step_sources, self.__jump_sources
+        ):
+            jumped = shift(men & jump_sources, s) & opponent
+            for to in iter_bits(shift(jumped, s) & empty):
+                moves.append((to - 2 * s, to))
+
+            # Slide all kings at once, every bit of a frontier is exactly `step`
+            # squares away from the king it started from
+            ray, jumped, landing, step = kings, 0, 0, 0
+            while ray or jumped or landing:
+                step += 1
+                ray = shift(ray & step_sources, s)
+                landing = shift((jumped | landing) & step_sources, s) & empty
+                for to in iter_bits(landing):
+                    moves.append((to - step * s, to))
+                jumped = ray & opponent
+                ray &= empty
+
+        return moves
+
+    def required_moves_from(self, index: int) -> List[Tuple[int, int]]:
+        type = self.type_at(index)
+        if type in (CheckerType.WHITE_MAN, CheckerType.WHITE_KING):
+            opponent = self.black
+        elif type in (CheckerType.BLACK_MAN, CheckerType.BLACK_KING):
+            opponent = self.white
+        else:
+            return []
+        is_king = type in (CheckerType.WHITE_KING, CheckerType.BLACK_KING)
+        jumps = self.__jumps_from(index, is_king, opponent, self.empty)
+        return [(index, to) for _, to in jumps]
+
+    def sequences(
+        self, side: SideType
+    ) -> Iterator[Tuple[Tuple[int, ...], Tuple[int, ...]]]:
+        # Yields (path, captured squares) of every complete turn of the side
+        required_moves = self.required_moves(side)
+        if not required_moves:
+            for from_, to in self.optional_moves(side):
+                yield (from_, to), ()
+            return
+
+        _, kings, opponent = self.__side_masks(side)
+        promotion = self.__promotion_masks[side == SideType.BLACK]
+        for from_ in dict.fromkeys(from_ for from_, _ in required_moves):
+            yield from self.__chains(
+                (from_,),
+                (),
+                bool(kings >> from_ & 1),
+                opponent,
+                self.empty | 1 << from_,
+                promotion,
+            )
+
+    def optional_moves(self, side: SideType) -> List[Tuple[int, int]]:
+        men, kings, _ = self.__side_masks(side)
+        empty = self.empty
+        moves: List[Tuple[int, int]] = []
+
+        forward = (0, 1) if side == SideType.WHITE else (2, 3)
+        for direction, (s, step_sources) in enumerate(
+            zip(self.__shifts, self.__step_sources)
+        ):
+            if direction in forward:
+                for to in iter_bits(shift(men & step_sources, s) & empty):
+                    moves.append((to - s, to))
+
+            ray, step = kings, 0
+            while ray:
+                step += 1
+                ray = shift(ray & step_sources, s) & empty
+                for to in iter_bits(ray):
+                    moves.append((to - step * s, to))
+
+        return moves
+
+    def mobility(self, side: SideType) -> int:
+        men, kings, _ = self.__side_masks(side)
+        empty = self.empty
+        forward = (0, 1) if side == SideType.WHITE else (2, 3)
+        mobility = 0
+        for direction, (s, step_sources) in enumerate(
+            zip(self.__shifts, self.__step_sources)
+        ):
+            movers = (men | kings) if direction in forward else kings
+            mobility += (shift(movers & step_sources, s) & empty).bit_count()
+        return mobility
+
+    def __chains(
+        self,
+        path: Tuple[int, ...],
+        captured: Tuple[int, ...],
+        is_king: bool,
+        opponent: int,
+        empty: int,
+        promotion: int,
+    ) -> Iterator[Tuple[Tuple[int, ...], Tuple[int, ...]]]:
+        # Captured checkers leave the board right away, as in Board.make_move, and a man
+        # reaching the last row continues the chain as a king
+        jumps = self.__jumps_from(path[-1], is_king, opponent, empty)
+        if not jumps:
+            yield path, captured
+            return
+        for jumped, to in jumps:
+            yield from self.__chains(
+                path + (to,),
+                captured + (jumped,),
+                is_king or bool(promotion >> to & 1),
+                opponent & ~(1 << jumped),
+                (empty | 1 << path[-1] | 1 << jumped) & ~(1 << to),
+                promotion,
+            )
+
+    def __jumps_from(
+        self, index: int, is_king: bool, opponent: int, empty: int
+    ) -> List[Tuple[int, int]]:
+        jumps: List[Tuple[int, int]] = []
+        if not is_king:
+            for jumped, to in self.__tables.jumps[index]:
+                if jumped >= 0 and opponent >> jumped & 1 and empty >> to & 1:
+                    jumps.append((jumped, to))
+            return jumps
+
+        for ray in self.__tables.rays[index]:
+            jumped = -1
+            for to in ray:
+                if empty >> to & 1:
+                    if jumped >= 0:
+                        jumps.append((jumped, to))
+                elif jumped < 0 and opponent >> to & 1:
+                    jumped = to
+                else:
+                    break
+        return jumps
+
+    def __side_masks(self, side: SideType) -> Tuple[int, int, int]:
+        if side == SideType.WHITE:
+            return self.__white_men, self.__white_kings, self.black
+        elif side == SideType.BLACK:
+            return self.__black_men, self.__black_kings, self.white
+        return 0, 0, 0
@@ -1,12 +1,39 @@
-from math import inf
-from random import choice
-from typing import List, Tuple, Optional
-from functools import reduce
-
-from .move import Move
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    List,
+    Tuple,
+    Callable,
+    Iterator,
+    Optional,
+    FrozenSet,
+)
+from threading import Event
+from collections import OrderedDict
+
+from .move import Move, UndoInfo, MoveSequence
 from .side import SideType
-from .checker import BLACK_CHECKERS, WHITE_CHECKERS, Checker, CheckerType
-from .position import MOVE_OFFSETS, Position
+from .search import Searcher, SearchResult
+from .tables import direction
+from .checker import KING_SCORE, Checker, CheckerType
+from .zobrist import get_zobrist_keys
+from .bitboard import BitBoard
+from .position import Position
+from .evaluation import Evaluator, get_piece_square_tables
+from .transposition import TranspositionTable
+
+if TYPE_CHECKING:
+    from .book import OpeningBook
+    from .tablebase import Tablebase
+
+# Number of positions with side to move whose legal moves are kept
+MOVE_CACHE_SIZE: int = 64
+# Game is a draw when a position with the same side to move occurs this many times
+REPETITION_LIMIT: int = 3
+# or after this many turns of both sides in a row without a capture or a man move
+DRAW_TURNS: int = 80
+# Position history and men of both sides with number of empty squares at its start
+HistoryState = Tuple[List[int], Tuple[int, int, int]]
 
 
 class Board:
@@ -14,6 +41,24 @@ class Board:
         self.__x_size = x_size
         self.__y_size = y_size
         self.__checkers: List[List[Checker]]
+        self.__bitboard: BitBoard
+        self.__zobrist_keys = get_zobrist_keys(x_size, y_size)
+        self.__hash = 0
+        # Number of checkers of every type, kept up to date on every square change
+        self.__counts = {type: 0 for type in CheckerType}
+        self.__counts[CheckerType.NONE] = x_size * y_size
+        self.__piece_square_tables = get_piece_square_tables(x_size, y_size)
+        self.__piece_square_score = 0
+        # Legal moves and their destinations by source square, keyed by position hash
+        # with side to move, so they stay valid across moves, undos and copies
+        self.__move_cache: OrderedDict[
+            int, Tuple[Tuple[Move, ...], Dict[Position, FrozenSet[Position]]]
+        ] = OrderedDict()
+        # Position hashes with side to move at the start of every turn since the last
+        # capture or man move, earlier positions can not occur again. Men of both sides
+        # and number of empty squares tell when such a turn was made.
+        self.__history: List[int] = []
+        self.__irreversible = (0, 0, 0)
 
         self.__generate()
 
@@ -35,12 +80,55 @@ class Board:
             board += "\n"
         return f"x[{self.x_size}]:y[{self.y_size}]\n{board}"
 
+    def __reduce__(self) -> Tuple[Callable[..., "Board"], Tuple[int, ...], HistoryState]:
+        # Position history goes along, so searches in other processes see repetitions
+        return (
+            Board.from_bitboards,
+            (
+                self.x_size,
+                self.y_size,
+                self.__bitboard.white_men,
+                self.__bitboard.white_kings,
+                self.__bitboard.black_men,
+                self.__bitboard.black_kings,
+            ),
+            (self.__history, self.__irreversible),
+        )
+
+    def __setstate__(self, state: HistoryState) -> None:
+        history, self.__irreversible = state
+        self.__history = list(history)
+
+    @classmethod
+    def from_bitboards(
+        cls,
+        x_size: int,
+        y_size: int,
+        white_men: int,
+        white_kings: int,
+        black_men: int,
+        black_kings: int,
+    ) -> "Board":
+        board = cls(x_size, y_size)
+        for y in range(y_size):
+            for x in range(x_size):
+                bit = 1 << board.bitboard.index(x, y)
+                if white_men & bit:
+                    board.__set(x, y, CheckerType.WHITE_MAN)
+                elif white_kings & bit:
+                    board.__set(x, y, CheckerType.WHITE_KING)
+                elif black_men & bit:
+                    board.__set(x, y, CheckerType.BLACK_MAN)
+                elif black_kings & bit:
+                    board.__set(x, y, CheckerType.BLACK_KING)
+                else:
+                    board.__set(x, y, CheckerType.NONE)
+        return board
+
     @classmethod
     def copy(cls, board: "Board") -> "Board":
         board_copy = cls(board.x_size, board.y_size)
-        for y in range(board.y_size):
-            for x in range(board.x_size):
-                board_copy.at(x, y).type = board.type_at(x, y)
+        board_copy.restore_copy(board)
         return board_copy
 
     @property
@@ -55,29 +143,91 @@ class Board:
     def size(self) -> int:
         return max(self.x_size, self.y_size)
 
+    @property
+    def bitboard(self) -> BitBoard:
+        return self.__bitboard
+
+    @property
+    def hash(self) -> int:
+        return self.__hash
+
+    @property
+    def history(self) -> Tuple[int, ...]:
+        return tuple(self.__history)
+
+    @property
+    def is_draw(self) -> bool:
+        if not self.__history:
+            return False
+        return (
+            len(self.__history) > DRAW_TURNS
+            or self.__history.count(self.__history[-1]) >= REPETITION_LIMIT
+        )
+
+    @property
+    def counts(self) -> Dict[CheckerType, int]:
+        return dict(self.__counts)
+
+    @property
+    def piece_square_score(self) -> int:
+        return self.__piece_square_score
+
     @property
     def white_checkers_count(self) -> int:
-        return self.__checkers_count(WHITE_CHECKERS)
+        return (
+            self.__counts[CheckerType.WHITE_MAN] + self.__counts[CheckerType.WHITE_KING]
+        )
 
     @property
     def black_checkers_count(self) -> int:
-        return self.__checkers_count(BLACK_CHECKERS)
+        return (
+            self.__counts[CheckerType.BLACK_MAN] + self.__counts[CheckerType.BLACK_KING]
+        )
 
     @property
     def white_score(self) -> int:
-        return self.__score(CheckerType.WHITE_MAN, CheckerType.WHITE_KING)
+        return (
+            self.__counts[CheckerType.WHITE_MAN]
+            + KING_SCORE * self.__counts[CheckerType.WHITE_KING]
+        )
 
     @property
     def black_score(self) -> int:
-        return self.__score(CheckerType.BLACK_MAN, CheckerType.BLACK_KING)
+        return (
+            self.__counts[CheckerType.BLACK_MAN]
+            + KING_SCORE * self.__counts[CheckerType.BLACK_KING]
+        )
 
     def restore_copy(self, board: "Board") -> None:
         self.__x_size = board.x_size
         self.__y_size = board.y_size
+        self.__bitboard.copy_from(board.bitboard)
+        self.__hash = board.hash
+        self.__counts = board.counts
+        self.__piece_square_score = board.piece_square_score
+        self.__history = list(board.__history)
+        self.__irreversible = board.__irreversible
         for y in range(board.y_size):
             for x in range(board.x_size):
                 self.at(x, y).type = board.type_at(x, y)
 
+    def position_hash(self, side: SideType) -> int:
+        if side == SideType.BLACK:
+            return self.__hash ^ self.__zobrist_keys.black_to_move
+        return self.__hash
+
+    def record_position(self, side: SideType) -> None:
+        # Called by whoever plays the game at the start of every turn
+        irreversible = (
+            self.__bitboard.white_men,
+            self.__bitboard.black_men,
+            self.__counts[CheckerType.NONE],
+        )
+        if irreversible != self.__irreversible:
+            self.__irreversible = irreversible
+            self.__history = []
+        self.__history.append(self.position_hash(side))
+
     def is_within(self, x: int, y: int) -> bool:
         return 0 <= x < self.x_size and 0 <= y < self.y_size
 
@@ -88,260 +238,175 @@ class Board:
         return self.at(x, y).type
 
     def handle_move(self, move: Move) -> bool:
-        if (
-            move.to.y == 0
-            and self.type_at(move.from_.x, move.from_.y) == CheckerType.WHITE_MAN
-        ):
-            self.at(move.from_.x, move.from_.y).type = CheckerType.WHITE_KING
-        elif (
-            move.to.y == self.y_size - 1
-            and self.type_at(move.from_.x, move.from_.y) == CheckerType.BLACK_MAN
-        ):
-            self.at(move.from_.x, move.from_.y).type = CheckerType.BLACK_KING
-        self.at(move.to.x, move.to.y).type = self.type_at(move.from_.x, move.from_.y)
-        self.at(move.from_.x, move.from_.y).type = CheckerType.NONE
-
-        dx = -1 if move.from_.x < move.to.x else 1
-        dy = -1 if move.from_.y < move.to.y else 1
-        has_killed = False
-        x, y = move.to.x, move.to.y
-        while x != move.from_.x or y != move.from_.y:
-            x += dx
-            y += dy
-            if self.type_at(x, y) != CheckerType.NONE:
-                self.at(x, y).type = CheckerType.NONE
-                has_killed = True
-        return has_killed
+        return bool(self.make_move(move).captured)
+
+    def make_move(self, move: Move) -> UndoInfo:
+        type = self.type_at(move.from_.x, move.from_.y)
+        promoted = (move.to.y == 0 and type == CheckerType.WHITE_MAN) or (
+            move.to.y == self.y_size - 1 and type == CheckerType.BLACK_MAN
+        )
+
+        captured: List[Tuple[Position, CheckerType]] = []
+        tables = self.__bitboard.tables
+        to = self.__bitboard.index(move.to.x, move.to.y)
+        ray = tables.rays[self.__bitboard.index(move.from_.x, move.from_.y)][
+            direction(move.to.x - move.from_.x, move.to.y - move.from_.y)
+        ]
+        for index in ray:
+            if index == to:
+                break
+            position = tables.positions[index]
+            if self.type_at(position.x, position.y) != CheckerType.NONE:
+                captured.append((position, self.type_at(position.x, position.y)))
+                self.__set(position.x, position.y, CheckerType.NONE)
+
+        self.__set(move.from_.x, move.from_.y, CheckerType.NONE)
+        self.__set(move.to.x, move.to.y, self.__promote(type) if promoted else type)
+        return UndoInfo(move, type, promoted, tuple(captured))
+
+    def make_sequence(self, sequence: MoveSequence) -> UndoInfo:
+        from_, to = sequence.path[0], sequence.path[-1]
+        type = self.type_at(from_.x, from_.y)
+        if type == CheckerType.WHITE_MAN:
+            promoted = any(position.y == 0 for position in sequence.path)
+        elif type == CheckerType.BLACK_MAN:
+            promoted = any(position.y == self.y_size - 1 for position in sequence.path)
+        else:
+            promoted = False
+
+        captured = tuple(
+            (position, self.type_at(position.x, position.y))
+            for position in sequence.captured
+        )
+        for position in sequence.captured:
+            self.__set(position.x, position.y, CheckerType.NONE)
+        self.__set(from_.x, from_.y, CheckerType.NONE)
+        self.__set(to.x, to.y, self.__promote(type) if promoted else type)
+        return UndoInfo(Move(from_, to), type, promoted, captured)
+
+    def unmake_move(self, undo: UndoInfo) -> None:
+        self.__set(undo.move.to.x, undo.move.to.y, CheckerType.NONE)
+        self.__set(undo.move.from_.x, undo.move.from_.y, undo.type)
+        for position, type in undo.captured:
+            self.__set(position.x, position.y, type)
 
     def is_game_over(self) -> Tuple[bool, Optional[SideType]]:
+        if not self.white_checkers_count:
+            return True, SideType.BLACK
+        if not self.black_checkers_count:
+            return True, SideType.WHITE
         white_moves = self.get_moves(SideType.WHITE)
         if not white_moves:
             return True, SideType.BLACK
         black_moves = self.get_moves(SideType.BLACK)
         if not black_moves:
             return True, SideType.WHITE
+        if self.is_draw:
+            return True, None
         return False, None
 
     def get_moves(self, side: SideType) -> List[Move]:
-        moves = self.get_required_moves(side)
-        if not moves:
-            moves = self.__get_optional_moves(side)
-        return moves
+        return list(self.__get_cached_moves(side)[0])
+
+    def get_move_destinations(
+        self, side: SideType
+    ) -> Dict[Position, FrozenSet[Position]]:
+        return dict(self.__get_cached_moves(side)[1])
 
     def get_required_moves(self, side: SideType) -> List[Move]:
-        required_moves: List[Move] = []
-        man: CheckerType
-        king: CheckerType
-        if side == SideType.WHITE:
-            man = CheckerType.WHITE_MAN
-            king = CheckerType.WHITE_KING
-            opponent_checkers = BLACK_CHECKERS
-        elif side == SideType.BLACK:
-            man = CheckerType.BLACK_MAN
-            king = CheckerType.BLACK_KING
-            opponent_checkers = WHITE_CHECKERS
-        else:
-            return required_moves
+        return self.__to_moves(self.__bitboard.required_moves(side))
+
+    def get_move_sequences(self, side: SideType) -> Iterator[MoveSequence]:
+        positions = self.__bitboard.tables.positions
+        for path, captured in self.__bitboard.sequences(side):
+            yield MoveSequence(
+                tuple(positions[index] for index in path),
+                tuple(positions[index] for index in captured),
+            )
 
-        for y in range(self.y_size):
-            for x in range(self.x_size):
-                if self.type_at(x, y) == man:
-                    for offset in MOVE_OFFSETS:
-                        x_offset = x + 2 * offset.x
-                        y_offset = y + 2 * offset.y
-                        if not self.is_within(x_offset, y_offset):
-                            continue
-                        if (
-                            self.type_at(x + offset.x, y + offset.y) in opponent_checkers
-                            and self.type_at(x_offset, y_offset) == CheckerType.NONE
-                        ):
-                            required_moves.append(
-                                Move(Position(x, y), Position(x_offset, y_offset))
-                            )
-                elif self.type_at(x, y) == king:
-                    for offset in MOVE_OFFSETS:
-                        if not self.is_within(x + 2 * offset.x, y + 2 * offset.y):
-                            continue
-                        has_opponent_checker_on_way = False
-                        for shift in range(1, self.size):
-                            x_offset = x + shift * offset.x
-                            y_offset = y + shift * offset.y
-                            if not self.is_within(x_offset, y_offset):
-                                continue
-                            if not has_opponent_checker_on_way:
-                                if self.type_at(x_offset, y_offset) in opponent_checkers:
-                                    has_opponent_checker_on_way = True
-                                    continue
-                                elif self.type_at(x_offset, y_offset) in (man, king):
-                                    break
-                            if has_opponent_checker_on_way:
-                                if self.type_at(x_offset, y_offset) == CheckerType.NONE:
-                                    required_moves.append(
-                                        Move(Position(x, y), Position(x_offset, y_offset))
-                                    )
-                                else:
-                                    break
-
-        return required_moves
-
-    def get_optimal_move(self, side: SideType, max_prediction_depth: int) -> List[Move]:
-        best_result = 0.0
-        optimal_moves: List[List[Move]] = []
-        possible_moves = self.__get_possible_moves(side, max_prediction_depth)
-
-        if possible_moves:
-            board_copy = Board.copy(self)
-            for moves in possible_moves:
-                for move in moves:
-                    self.handle_move(move)
-                    try:
-                        if side == SideType.WHITE:
-                            result = self.white_score / self.black_score
-                        elif side == SideType.BLACK:
-                            result = self.black_score / self.white_score
-                    except ZeroDivisionError:
-                        result = inf
-                    if result > best_result:
-                        best_result = result
-                        optimal_moves.clear()
-                        optimal_moves.append(moves)
-                    elif result == best_result:
-                        optimal_moves.append(moves)
-                    self.restore_copy(board_copy)
-
-        optimal_move: List[Move] = []
-        if optimal_moves:
-            for move in choice(optimal_moves):
-                if (
-                    side == SideType.WHITE
-                    and self.type_at(move.from_.x, move.from_.y) in BLACK_CHECKERS
-                ):
-                    break
-                elif (
-                    side == SideType.BLACK
-                    and self.type_at(move.from_.x, move.from_.y) in WHITE_CHECKERS
-                ):
-                    break
-                optimal_move.append(move)
-        return optimal_move
+    def get_required_moves_from(self, position: Position) -> List[Move]:
+        index = self.__bitboard.index(position.x, position.y)
+        return self.__to_moves(self.__bitboard.required_moves_from(index))
+
+    def get_optimal_move(
+        self,
+        side: SideType,
+        max_prediction_depth: int,
+        time_ms: Optional[int] = None,
+        table: Optional[TranspositionTable] = None,
+        evaluator: Optional[Evaluator] = None,
+        book: Optional["OpeningBook"] = None,
+        tablebase: Optional["Tablebase"] = None,
+        stop: Optional[Event] = None,
+        on_iteration: Optional[Callable[[SearchResult], None]] = None,
+    ) -> List[Move]:
+        if book is not None:
+            sequence = book.probe(self, side)
+            if sequence is not None:
+                return sequence.moves
+        searcher = Searcher(self, table, evaluator, tablebase)
+        return searcher.search(
+            side, max_prediction_depth, time_ms, stop=stop, on_iteration=on_iteration
+        ).moves
+
+    def __get_cached_moves(
+        self, side: SideType
+    ) -> Tuple[Tuple[Move, ...], Dict[Position, FrozenSet[Position]]]:
+        key = self.position_hash(side)
+        cached = self.__move_cache.get(key)
+        if cached is not None:
+            self.__move_cache.move_to_end(key)
+            return cached
+
+        moves = self.get_required_moves(side)
+        if not moves:
+            moves = self.__to_moves(self.__bitboard.optional_moves(side))
+        destinations: Dict[Position, List[Position]] = {}
+        for move in moves:
+            destinations.setdefault(move.from_, []).append(move.to)
+        cached = (
+            tuple(moves),
+            {from_: frozenset(to) for from_, to in destinations.items()},
+        )
+        self.__move_cache[key] = cached
+        if len(self.__move_cache) > MOVE_CACHE_SIZE:
+            self.__move_cache.popitem(last=False)
+        return cached
 
     def __generate(self) -> None:
         self.__checkers = [
             [Checker() for _ in range(self.x_size)] for _ in range(self.y_size)
         ]
+        self.__bitboard = BitBoard(self.x_size, self.y_size)
 
         for y in range(self.y_size):
             for x in range(self.x_size):
                 if (y + x) % 2:
                     if y < 3:
-                        self.__checkers[y][x].type = CheckerType.BLACK_MAN
+                        self.__set(x, y, CheckerType.BLACK_MAN)
                     elif y >= self.y_size - 3:
-                        self.__checkers[y][x].type = CheckerType.WHITE_MAN
-
-    def __checkers_count(self, checkers: Tuple[CheckerType, ...]) -> int:
-        return sum(
-            reduce(lambda s, c: s + int(c.type in checkers), row, 0)
-            for row in self.__checkers
-        )
-
-    def __score(self, man: CheckerType, king: CheckerType) -> int:
-        return sum(
-            reduce(
-                lambda s, c: s + int(c.type == man) + 3 * int(c.type == king),
-                row,
-                0,
-            )
-            for row in self.__checkers
-        )
-
-    def __get_optional_moves(self, side: SideType) -> List[Move]:
-        moves: List[Move] = []
-        man: CheckerType
-        king: CheckerType
-        if side == SideType.WHITE:
-            man = CheckerType.WHITE_MAN
-            king = CheckerType.WHITE_KING
-        elif side == SideType.BLACK:
-            man = CheckerType.BLACK_MAN
-            king = CheckerType.BLACK_KING
-        else:
-            return moves
-
-        for y in range(self.y_size):
-            for x in range(self.x_size):
-                if self.type_at(x, y) == man:
-                    for offset in (
-                        MOVE_OFFSETS[:2] if side == SideType.WHITE else MOVE_OFFSETS[2:]
-                    ):
-                        x_offset = x + offset.x
-                        y_offset = y + offset.y
-                        if not self.is_within(x_offset, y_offset):
-                            continue
-                        if self.type_at(x_offset, y_offset) == CheckerType.NONE:
-                            moves.append(
-                                Move(Position(x, y), Position(x_offset, y_offset))
-                            )
-                elif self.type_at(x, y) == king:
-                    for offset in MOVE_OFFSETS:
-                        if not self.is_within(x + offset.x, y + offset.y):
-                            continue
-                        for shift in range(1, self.size):
-                            x_offset = x + shift * offset.x
-                            y_offset = y + shift * offset.y
-                            if not self.is_within(x_offset, y_offset):
-                                continue
-                            if self.type_at(x_offset, y_offset) == CheckerType.NONE:
-                                moves.append(
-                                    Move(Position(x, y), Position(x_offset, y_offset))
-                                )
-                            else:
-                                break
-
-        return moves
-
-    def __get_possible_moves(
-        self,
-        side: SideType,
-        max_prediction_depth: int,
-        prediction_depth: int = 0,
-        all_moves: List[List[Move]] = [],
-        current_moves: List[Move] = [],
-        required_moves: List[Move] = [],
-    ) -> List[List[Move]]:
-        if current_moves:
-            all_moves.append(current_moves)
-        else:
-            all_moves.clear()
-        if required_moves:
-            moves = required_moves
-        else:
-            moves = self.get_moves(side)
-        if moves and prediction_depth < max_prediction_depth:
-            board_copy = Board.copy(self)
-            for move in moves:
-                has_killed = self.handle_move(move)
-                required_moves = list(
-                    filter(
-                        lambda req: move.to.x == req.from_.x and move.to.y == req.from_.y,
-                        self.get_required_moves(side),
-                    )
-                )
-                if has_killed and required_moves:
-                    self.__get_possible_moves(
-                        side,
-                        max_prediction_depth,
-                        prediction_depth,
-                        all_moves,
-                        current_moves + [move],
-                        required_moves,
-                    )
-                else:
-                    self.__get_possible_moves(
-                        SideType.opposite(side),
-                        max_prediction_depth,
-                        prediction_depth + 1,
-                        all_moves,
-                        current_moves + [move],
-                    )
-                self.restore_copy(board_copy)
-        return all_moves
+                        self.__set(x, y, CheckerType.WHITE_MAN)
+
+    def __set(self, x: int, y: int, type: CheckerType) -> None:
+        index = self.__bitboard.index(x, y)
+        pieces = self.__zobrist_keys.pieces
+        previous_type = self.__checkers[y][x].type
+        self.__hash ^= pieces[previous_type][index] ^ pieces[type][index]
+        self.__counts[previous_type] -= 1
+        self.__counts[type] += 1
+        tables = self.__piece_square_tables
+        self.__piece_square_score += tables[type][index] - tables[previous_type][index]
+        self.__checkers[y][x].type = type
+        self.__bitboard.set(index, type)
+
+    def __promote(self, type: CheckerType) -> CheckerType:
+        if type == CheckerType.WHITE_MAN:
+            return CheckerType.WHITE_KING
+        elif type == CheckerType.BLACK_MAN:
+            return CheckerType.BLACK_KING
+        return type
+
+    def __to_moves(self, moves: List[Tuple[int, int]]) -> List[Move]:
+        squares = self.x_size * self.y_size
+        cache = self.__bitboard.tables.moves
+        return [cache[from_ * squares + to] for from_, to in moves]
@@ -0,0 +1,186 @@
+import sys
+import json
+import mmap
+import random
+import struct
+import argparse
+from typing import Any, Dict, List, Tuple, Iterable, Optional
+from pathlib import Path
+
+from .move import MoveSequence
+from .side import SideType
+from .board import Board
+from .search import Searcher
+from .position import Position
+
+# Header is magic, version, x_size, y_size and number of records
+HEADER = struct.Struct("<4sHBBI")
+# Record is position hash with side to move, from and to square indexes and weight
+RECORD = struct.Struct("<QHHH")
+MAGIC: bytes = b"CKBK"
+VERSION: int = 1
+MAX_WEIGHT: int = 2**16 - 1
+
+
+class OpeningBook:
+    def __init__(self, path: Path) -> None:
+        with open(path, "rb") as file:
+            self.__data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, x_size, y_size, count = HEADER.unpack_from(self.__data)
+        self.__x_size: int = x_size
+        self.__y_size: int = y_size
+        self.__count: int = count
+        if magic != MAGIC or version != VERSION:
+            self.__data.close()
+            raise ValueError(f"{path} is not an opening book")
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def close(self) -> None:
+        self.__data.close()
+
+    def entries(self, key: int) -> List[Tuple[int, int, int]]:
+        # Binary search of the first record with the key, records are sorted by key
+        low, high = 0, self.__count
+        while low < high:
+            middle = (low + high) // 2
+            if self.__record(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        entries: List[Tuple[int, int, int]] = []
+        while low < self.__count:
+            record_key, from_, to, weight = self.__record(low)
+            if record_key != key:
+                break
+            entries.append((from_, to, weight))
+            low += 1
+        return entries
+
+    def probe(self, board: Board, side: SideType) -> Optional[MoveSequence]:
+        if (board.x_size, board.y_size) != (self.__x_size, self.__y_size):
+            return None
+        entries = self.entries(board.position_hash(side))
+        if not entries:
+            return None
+
+        sequences = {
+            (
+                board.bitboard.index(sequence.path[0].x, sequence.path[0].y),
+                board.bitboard.index(sequence.path[-1].x, sequence.path[-1].y),
+            ): sequence
+            for sequence in board.get_move_sequences(side)
+        }
+        candidates = [
+            (sequences[(from_, to)], weight)
+            for from_, to, weight in entries
+            if (from_, to) in sequences
+        ]
+        if not candidates:
+            return None
+        return random.choices(
+            [sequence for sequence, _ in candidates],
+            [weight for _, weight in candidates],
+        )[0]
+
+    def __record(self, index: int) -> Tuple[int, int, int, int]:
+        return RECORD.unpack_from(self.__data, HEADER.size + index * RECORD.size)
+
+
+class OpeningBookBuilder:
+    def __init__(self, x_size: int = 8, y_size: int = 8) -> None:
+        self.__x_size = x_size
+        self.__y_size = y_size
+        self.__weights: Dict[Tuple[int, int, int], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.__weights)
+
+    def add(
+        self, board: Board, side: SideType, sequence: MoveSequence, weight: int = 1
+    ) -> None:
+        key = (
+            board.position_hash(side),
+            board.bitboard.index(sequence.path[0].x, sequence.path[0].y),
+            board.bitboard.index(sequence.path[-1].x, sequence.path[-1].y),
+        )
+        self.__weights[key] = min(self.__weights.get(key, 0) + weight, MAX_WEIGHT)
+
+    def add_search(self, plies: int, depth: int, time_ms: Optional[int] = None) -> None:
+        # Stores the searched best move of every position reachable in given plies
+        positions = [(Board(self.__x_size, self.__y_size), SideType.WHITE)]
+        for ply in range(plies):
+            next_positions: Dict[int, Tuple[Board, SideType]] = {}
+            for position, side in positions:
+                result = Searcher(position).search(side, depth, time_ms)
+                if result.sequence is not None:
+                    self.add(position, side, result.sequence)
+                if ply == plies - 1:
+                    continue
+                for sequence in position.get_move_sequences(side):
+                    next_position = Board.copy(position)
+                    next_position.make_sequence(sequence)
+                    next_side = SideType.opposite(side)
+                    next_positions[next_position.position_hash(next_side)] = (
+                        next_position,
+                        next_side,
+                    )
+            positions = list(next_positions.values())
+
+    def add_games(self, records: Iterable[Dict[str, Any]], plies: int) -> None:
+        # Stores the first moves of the winning side from runner JSONL records
+        for record in records:
+            if record["winner"] is None:
+                continue
+            board = Board(record["settings"]["x_size"], record["settings"]["y_size"])
+            if (board.x_size, board.y_size) != (self.__x_size, self.__y_size):
+                continue
+            for move in record["moves"][:plies]:
+                side = SideType[move["side"]]
+                path = tuple(Position(*position) for position in move["path"])
+                for sequence in board.get_move_sequences(side):
+                    if sequence.path == path:
+                        if side.name == record["winner"]:
+                            self.add(board, side, sequence)
+                        board.make_sequence(sequence)
+                        break
+                else:
+                    break
+
+    def write(self, path: Path) -> None:
+        records = sorted(
+            (key, from_, to, weight)
+            for (key, from_, to), weight in self.__weights.items()
+        )
+        with open(path, "wb") as file:
+            file.write(
+                HEADER.pack(MAGIC, VERSION, self.__x_size, self.__y_size, len(records))
+            )
+            for record in records:
+                file.write(RECORD.pack(*record))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build an opening book")
+    parser.add_argument("--output", default="book.bin")
+    parser.add_argument("--size", type=int, default=8)
+    parser.add_argument("--plies", type=int, default=4, help="book length in turns")
+    parser.add_argument("--depth", type=int, default=6, help="search depth of a move")
+    parser.add_argument("--time-ms", type=int)
+    parser.add_argument("--games", help="JSONL self-play records to learn from")
+    args = parser.parse_args()
+
+    builder = OpeningBookBuilder(args.size, args.size)
+    if args.games:
+        with open(args.games) as games:
+            builder.add_games(map(json.loads, games), args.plies)
+    else:
+        builder.add_search(args.plies, args.depth, args.time_ms)
+    builder.write(Path(args.output))
+    print(f"{len(builder)} positions written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -32,3 +32,6 @@ BLACK_CHECKERS: Tuple[CheckerType, CheckerType] = (
     CheckerType.BLACK_MAN,
     CheckerType.BLACK_KING,
 )
+
+# Weight of a king relative to a man in the material score
+KING_SCORE: int = 3
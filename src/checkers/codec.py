@@ -0,0 +1,345 @@
+import re
+import sys
+import json
+import struct
+import argparse
+from typing import (
+    Any,
+    Dict,
+    List,
+    Tuple,
+    BinaryIO,
+    Iterable,
+    Iterator,
+    Optional,
+    NamedTuple,
+)
+from pathlib import Path
+
+from .move import MoveSequence
+from .side import SideType
+from .board import Board
+from .tables import get_board_tables
+from .bitboard import iter_bits
+from .position import Position
+
+# File header is magic, version, x_size and y_size
+FILE_HEADER = struct.Struct("<4sHBB")
+# Record header is size of the rest of the record in bytes, winner and number of turns,
+# the rest is the packed starting position and turns as path length and dark squares
+RECORD_HEADER = struct.Struct("<IBH")
+MAGIC: bytes = b"CKGR"
+VERSION: int = 1
+# Results of finished games by winner, None is a draw
+WINNERS: Dict[Optional[SideType], int] = {None: 3, SideType.WHITE: 1, SideType.BLACK: 2}
+UNFINISHED: int = 0
+PDN_RESULTS: Dict[Optional[SideType], str] = {
+    None: "1/2-1/2",
+    SideType.WHITE: "1-0",
+    SideType.BLACK: "0-1",
+}
+PDN_UNFINISHED: str = "*"
+# Results written with two points for a win
+PDN_ALIASES: Dict[str, Optional[SideType]] = {
+    "1-1": None,
+    "2-0": SideType.WHITE,
+    "0-2": SideType.BLACK,
+}
+
+
+class GameRecord(NamedTuple):
+    board: Board  # starting position
+    side: SideType  # side which moves first
+    turns: Tuple[Tuple[Position, ...], ...]  # path of every turn
+    winner: Optional[SideType] = None  # None is a draw when the game is finished
+    finished: bool = True
+
+
+def position_size(x_size: int, y_size: int) -> int:
+    # Bytes of a packed position: white, black and king bits of every dark square and
+    # the side to move
+    return (3 * len(get_board_tables(x_size, y_size).dark_squares) + 1 + 7) // 8
+
+
+def encode_position(board: Board, side: SideType) -> bytes:
+    tables = get_board_tables(board.x_size, board.y_size)
+    squares = len(tables.dark_squares)
+    bitboard = board.bitboard
+    value = int(side == SideType.BLACK)
+    for shift, mask in (
+        (1, bitboard.white),
+        (1 + squares, bitboard.black),
+        (1 + 2 * squares, bitboard.white_kings | bitboard.black_kings),
+    ):
+        for square in iter_bits(mask):
+            value |= 1 << shift + tables.ordinals[square]
+    return value.to_bytes(position_size(board.x_size, board.y_size), "little")
+
+
+def decode_position(data: bytes, x_size: int, y_size: int) -> Tuple[Board, SideType]:
+    dark_squares = get_board_tables(x_size, y_size).dark_squares
+    squares = len(dark_squares)
+    value = int.from_bytes(data[: position_size(x_size, y_size)], "little")
+    white, black, kings = 0, 0, 0
+    for i, square in enumerate(dark_squares):
+        white |= (value >> 1 + i & 1) << square
+        black |= (value >> 1 + squares + i & 1) << square
+        kings |= (value >> 1 + 2 * squares + i & 1) << square
+    board = Board.from_bitboards(
+        x_size, y_size, white & ~kings, white & kings, black & ~kings, black & kings
+    )
+    return board, SideType.BLACK if value & 1 else SideType.WHITE
+
+
+def record_from_game(game: Dict[str, Any]) -> GameRecord:
+    # Record of a game played by checkers.runner
+    board = Board(game["settings"]["x_size"], game["settings"]["y_size"])
+    turns = tuple(
+        tuple(Position(*position) for position in move["path"]) for move in game["moves"]
+    )
+    winner = None if game["winner"] is None else SideType[game["winner"]]
+    return GameRecord(board, SideType.WHITE, turns, winner)
+
+
+class GameWriter:
+    def __init__(self, file: BinaryIO, x_size: int = 8, y_size: int = 8) -> None:
+        self.__file = file
+        self.__x_size = x_size
+        self.__y_size = y_size
+        self.__ordinals = get_board_tables(x_size, y_size).ordinals
+        file.write(FILE_HEADER.pack(MAGIC, VERSION, x_size, y_size))
+
+    def write(self, record: GameRecord) -> None:
+        if (record.board.x_size, record.board.y_size) != (self.__x_size, self.__y_size):
+            raise ValueError("Game is played on a board of another size")
+        body = bytearray(encode_position(record.board, record.side))
+        for path in record.turns:
+            body.append(len(path))
+            body.extend(
+                self.__ordinals[position.y * self.__x_size + position.x]
+                for position in path
+            )
+        self.__file.write(
+            RECORD_HEADER.pack(
+                len(body),
+                WINNERS[record.winner] if record.finished else UNFINISHED,
+                len(record.turns),
+            )
+        )
+        self.__file.write(body)
+
+
+class GameReader:
+    def __init__(self, file: BinaryIO) -> None:
+        # Records are read one by one while iterating, so files of any size can be read
+        self.__file = file
+        magic, version, x_size, y_size = FILE_HEADER.unpack(file.read(FILE_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("File is not a game archive")
+        self.__x_size: int = x_size
+        self.__y_size: int = y_size
+
+    @property
+    def x_size(self) -> int:
+        return self.__x_size
+
+    @property
+    def y_size(self) -> int:
+        return self.__y_size
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        tables = get_board_tables(self.__x_size, self.__y_size)
+        winners = {value: winner for winner, value in WINNERS.items()}
+        start = position_size(self.__x_size, self.__y_size)
+        while header := self.__file.read(RECORD_HEADER.size):
+            size, winner, turns_count = RECORD_HEADER.unpack(header)
+            body = self.__file.read(size)
+            board, side = decode_position(body, self.__x_size, self.__y_size)
+            turns = []
+            offset = start
+            for _ in range(turns_count):
+                first, end = offset + 1, offset + 1 + body[offset]
+                turns.append(
+                    tuple(
+                        tables.positions[tables.dark_squares[ordinal]]
+                        for ordinal in body[first:end]
+                    )
+                )
+                offset = end
+            yield GameRecord(
+                board, side, tuple(turns), winners.get(winner), winner != UNFINISHED
+            )
+
+
+def to_pdn(record: GameRecord) -> str:
+    # Dark squares are numbered from 1 row by row from the top left corner
+    board, side = record.board, record.side
+    tables = get_board_tables(board.x_size, board.y_size)
+    result = PDN_RESULTS[record.winner] if record.finished else PDN_UNFINISHED
+    lines = [f'[Result "{result}"]']
+    initial = Board(board.x_size, board.y_size)
+    if board.hash != initial.hash or side != SideType.WHITE:
+        lines.append(f'[FEN "{to_fen(board, side)}"]')
+
+    tokens: List[str] = []
+    number = 1
+    board = Board.copy(board)
+    for i, path in enumerate(record.turns):
+        if side == SideType.WHITE:
+            tokens.append(f"{number}.")
+        elif i == 0:
+            tokens.append(f"{number}...")
+        sequence = _find_sequence(board, side, list(path))
+        if sequence is None:
+            raise ValueError(f"Illegal turn {path}")
+        board.make_sequence(sequence)
+        squares = (
+            str(tables.ordinals[position.y * board.x_size + position.x] + 1)
+            for position in path
+        )
+        tokens.append(("x" if sequence.captured else "-").join(squares))
+        if side == SideType.BLACK:
+            number += 1
+        side = SideType.opposite(side)
+    tokens.append(result)
+    return "\n".join(lines) + "\n\n" + " ".join(tokens) + "\n"
+
+
+def from_pdn(text: str, x_size: int = 8, y_size: int = 8) -> Iterator[GameRecord]:
+    # Turns are checked against the rules, captures may list only some of their squares
+    tables = get_board_tables(x_size, y_size)
+    results = {pdn: winner for winner, pdn in PDN_RESULTS.items()} | PDN_ALIASES
+    text = re.sub(r"\{[^}]*\}", " ", text)
+    tags: Dict[str, str] = {}
+    turns: List[Tuple[Position, ...]] = []
+    board, side = Board(x_size, y_size), SideType.WHITE
+    start: Optional[Tuple[Board, SideType]] = None
+    for tag, value, token in re.findall(r'\[(\w+)\s+"([^"]*)"\]|(\S+)', text):
+        if tag:
+            tags[tag] = value
+            continue
+        if start is None:
+            if "FEN" in tags:
+                board, side = from_fen(tags["FEN"], x_size, y_size)
+            start = Board.copy(board), side
+        if re.fullmatch(r"\d+\.+", token):
+            continue
+        if token in results or token == PDN_UNFINISHED:
+            yield GameRecord(
+                start[0],
+                start[1],
+                tuple(turns),
+                results.get(token),
+                token != PDN_UNFINISHED,
+            )
+            tags, turns, start = {}, [], None
+            board, side = Board(x_size, y_size), SideType.WHITE
+            continue
+
+        squares = [
+            tables.positions[tables.dark_squares[int(square) - 1]]
+            for square in re.split("[-x]", token)
+        ]
+        sequence = _find_sequence(board, side, squares)
+        if sequence is None:
+            raise ValueError(f"Illegal move {token}")
+        board.make_sequence(sequence)
+        turns.append(sequence.path)
+        side = SideType.opposite(side)
+
+
+def _find_sequence(
+    board: Board, side: SideType, squares: List[Position]
+) -> Optional[MoveSequence]:
+    # Exact path first, then any path through the squares in order
+    found: Optional[MoveSequence] = None
+    for sequence in board.get_move_sequences(side):
+        if sequence.path == tuple(squares):
+            return sequence
+        if sequence.path[0] != squares[0] or sequence.path[-1] != squares[-1]:
+            continue
+        path = iter(sequence.path)
+        if found is None and all(square in path for square in squares):
+            found = sequence
+    return found
+
+
+def to_fen(board: Board, side: SideType) -> str:
+    tables = get_board_tables(board.x_size, board.y_size)
+    bitboard = board.bitboard
+    sections = []
+    for color, men, kings in (
+        ("W", bitboard.white_men, bitboard.white_kings),
+        ("B", bitboard.black_men, bitboard.black_kings),
+    ):
+        squares = sorted(
+            [(tables.ordinals[square] + 1, "") for square in iter_bits(men)]
+            + [(tables.ordinals[square] + 1, "K") for square in iter_bits(kings)]
+        )
+        sections.append(color + ",".join(f"{king}{square}" for square, king in squares))
+    return ":".join(["W" if side == SideType.WHITE else "B"] + sections)
+
+
+def from_fen(fen: str, x_size: int, y_size: int) -> Tuple[Board, SideType]:
+    dark_squares = get_board_tables(x_size, y_size).dark_squares
+    turn, *sections = fen.strip().rstrip(".").split(":")
+    masks = {"W": [0, 0], "B": [0, 0]}
+    if turn not in masks or any(section[:1] not in masks for section in sections):
+        raise ValueError(f"Invalid FEN {fen!r}")
+    for section in sections:
+        color, squares = section[0], section[1:]
+        for square in filter(None, squares.split(",")):
+            is_king = square.startswith("K")
+            number = int(square.lstrip("K"))
+            if not 1 <= number <= len(dark_squares):
+                raise ValueError(f"Invalid square {square!r} in FEN")
+            masks[color][is_king] |= 1 << dark_squares[number - 1]
+    board = Board.from_bitboards(x_size, y_size, *masks["W"], *masks["B"])
+    return board, SideType.WHITE if turn == "W" else SideType.BLACK
+
+
+def read_records(path: Path) -> Iterator[GameRecord]:
+    # Records of a game archive, a PDN file or checkers.runner JSONL by file extension
+    if path.suffix == ".pdn":
+        yield from from_pdn(path.read_text())
+    elif path.suffix == ".jsonl":
+        with open(path) as games:
+            yield from map(record_from_game, map(json.loads, games))
+    else:
+        with open(path, "rb") as file:
+            yield from GameReader(file)
+
+
+def write_records(path: Path, records: Iterable[GameRecord]) -> int:
+    count = 0
+    if path.suffix == ".pdn":
+        with open(path, "w") as output:
+            for count, record in enumerate(records, 1):
+                output.write(to_pdn(record) + "\n")
+        return count
+
+    with open(path, "wb") as file:
+        writer: Optional[GameWriter] = None
+        for count, record in enumerate(records, 1):
+            if writer is None:
+                writer = GameWriter(file, record.board.x_size, record.board.y_size)
+            writer.write(record)
+        if writer is None:
+            GameWriter(file)
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Convert games between runner JSONL, PDN and the binary archive"
+    )
+    parser.add_argument("input", type=Path, help=".jsonl, .pdn or a game archive")
+    parser.add_argument("output", type=Path, help=".pdn or a game archive")
+    args = parser.parse_args()
+
+    count = write_records(args.output, read_records(args.input))
+    print(f"{count} games written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Dict, Tuple
+from functools import lru_cache
+
+from .side import SideType
+from .checker import KING_SCORE, CheckerType
+
+if TYPE_CHECKING:
+    from .board import Board
+
+MAN_VALUE: int = 100
+KING_VALUE: int = KING_SCORE * MAN_VALUE
+ADVANCE_BONUS: int = 4  # per row a man has moved towards promotion
+BACK_RANK_BONUS: int = 12  # man left on its own back rank guards it from promotions
+CENTER_BONUS: int = 3  # per step away from the board edges
+MOBILITY_BONUS: int = 2  # per square a checker can step on
+TEMPO_BONUS: int = 5  # side to move
+
+
+@lru_cache
+def get_piece_square_tables(
+    x_size: int, y_size: int
+) -> Dict[CheckerType, Tuple[int, ...]]:
+    # Values are signed from white's point of view and include material
+    tables: Dict[CheckerType, Tuple[int, ...]] = {}
+    for type in CheckerType:
+        values = []
+        for y in range(y_size):
+            for x in range(x_size):
+                values.append(_piece_square_value(type, x, y, x_size, y_size))
+        tables[type] = tuple(values)
+    return tables
+
+
+def _piece_square_value(
+    type: CheckerType, x: int, y: int, x_size: int, y_size: int
+) -> int:
+    edge_distance = min(x, x_size - 1 - x)
+    match type:
+        case CheckerType.WHITE_MAN:
+            back_rank = BACK_RANK_BONUS if y == y_size - 1 else 0
+            advance = ADVANCE_BONUS * (y_size - 1 - y)
+            return MAN_VALUE + advance + back_rank + CENTER_BONUS * min(edge_distance, 2)
+        case CheckerType.BLACK_MAN:
+            back_rank = BACK_RANK_BONUS if y == 0 else 0
+            advance = ADVANCE_BONUS * y
+            return -(
+                MAN_VALUE + advance + back_rank + CENTER_BONUS * min(edge_distance, 2)
+            )
+        case CheckerType.WHITE_KING:
+            return KING_VALUE + CENTER_BONUS * min(edge_distance, y, y_size - 1 - y)
+        case CheckerType.BLACK_KING:
+            return -(KING_VALUE + CENTER_BONUS * min(edge_distance, y, y_size - 1 - y))
+    return 0
+
+
+class Evaluator(ABC):
+    @abstractmethod
+    def evaluate(self, board: "Board", side: SideType) -> int:
+        pass
+
+
+class MaterialEvaluator(Evaluator):
+    def evaluate(self, board: "Board", side: SideType) -> int:
+        score = MAN_VALUE * (board.white_score - board.black_score)
+        return score if side == SideType.WHITE else -score
+
+
+class PieceSquareEvaluator(Evaluator):
+    def evaluate(self, board: "Board", side: SideType) -> int:
+        mobility = board.bitboard.mobility(SideType.WHITE) - board.bitboard.mobility(
+            SideType.BLACK
+        )
+        score = board.piece_square_score + MOBILITY_BONUS * mobility
+        return TEMPO_BONUS + (score if side == SideType.WHITE else -score)
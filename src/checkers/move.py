@@ -1,10 +1,12 @@
+from typing import List, Tuple, NamedTuple
+
+from .checker import CheckerType
 from .position import Position
 
 
-class Move:
-    def __init__(self, from_: Position = Position(), to: Position = Position()) -> None:
-        self.__from = from_
-        self.__to = to
+class Move(NamedTuple):
+    from_: Position = Position()
+    to: Position = Position()
 
     def __repr__(self) -> str:
         return f"{self.from_.x}:{self.from_.y} -> {self.to.x}:{self.to.y}"
@@ -12,15 +14,18 @@ class Move:
     def __str__(self) -> str:
         return self.__repr__()
 
-    def __eq__(self, value: object) -> bool:
-        if not isinstance(value, Move):
-            return NotImplemented
-        return self.from_ == value.from_ and self.to == value.to
 
-    @property
-    def from_(self) -> Position:
-        return self.__from
+class MoveSequence(NamedTuple):
+    path: Tuple[Position, ...]  # squares visited by the checker, from the first one
+    captured: Tuple[Position, ...]
 
     @property
-    def to(self) -> Position:
-        return self.__to
+    def moves(self) -> List[Move]:
+        return [Move(from_, to) for from_, to in zip(self.path, self.path[1:])]
+
+
+class UndoInfo(NamedTuple):
+    move: Move
+    type: CheckerType  # type of the moved checker before the move
+    promoted: bool
+    captured: Tuple[Tuple[Position, CheckerType], ...]
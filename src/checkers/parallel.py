@@ -0,0 +1,133 @@
+import os
+import argparse
+from time import perf_counter
+from typing import List, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+
+from .move import MoveSequence
+from .side import SideType
+from .board import Board
+from .search import MAX_PLY, WIN_SCORE, Searcher, SearchResult
+
+
+def _search_sequences(
+    board: Board,
+    side: SideType,
+    max_depth: int,
+    time_ms: Optional[int],
+    sequences: List[MoveSequence],
+) -> List[SearchResult]:
+    # Result of every completed iteration, workers deepen on their own within the time
+    iterations: List[SearchResult] = []
+    Searcher(board).search(
+        side, max_depth, time_ms, root_sequences=sequences, on_iteration=iterations.append
+    )
+    return iterations
+
+
+class ParallelSearcher:
+    def __init__(self, workers: Optional[int] = None) -> None:
+        self.__workers = workers or os.cpu_count() or 1
+        self.__executor = ProcessPoolExecutor(self.__workers)
+
+    def __enter__(self) -> "ParallelSearcher":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.shutdown()
+
+    @property
+    def workers(self) -> int:
+        return self.__workers
+
+    def shutdown(self) -> None:
+        self.__executor.shutdown(cancel_futures=True)
+
+    def search(
+        self,
+        board: Board,
+        side: SideType,
+        max_depth: int,
+        time_ms: Optional[int] = None,
+    ) -> SearchResult:
+        sequences = list(board.get_move_sequences(side))
+        if len(sequences) <= 1 or self.__workers == 1:
+            return Searcher(board).search(
+                side, max_depth, time_ms, root_sequences=sequences
+            )
+
+        # Every worker searches its own slice of the root moves on a pickled board
+        workers = self.__workers
+        chunks = [sequences[i::workers] for i in range(workers)]
+        futures = [
+            self.__executor.submit(
+                _search_sequences, board, side, max_depth, time_ms, chunk
+            )
+            for chunk in chunks
+            if chunk
+        ]
+        iterations = [future.result() for future in futures]
+        # Scores are compared at the deepest depth completed by every worker, proven
+        # wins and losses stop deepening early and hold at any depth
+        proven = [abs(results[-1].score) >= WIN_SCORE - MAX_PLY for results in iterations]
+        depth = min(
+            (
+                results[-1].depth
+                for results, is_proven in zip(iterations, proven)
+                if not is_proven
+            ),
+            default=max(results[-1].depth for results in iterations),
+        )
+        candidates = [
+            (
+                results[-1]
+                if is_proven
+                else next(result for result in reversed(results) if result.depth <= depth)
+            )
+            for results, is_proven in zip(iterations, proven)
+        ]
+        best = max(candidates, key=lambda result: result.score)
+        return SearchResult(
+            best.moves,
+            best.score,
+            depth,
+            sum(results[-1].nodes for results in iterations),
+            best.sequence,
+        )
+
+
+def benchmark(
+    board: Board, side: SideType, depth: int, workers: int
+) -> Tuple[float, float]:
+    start = perf_counter()
+    Searcher(board).search(side, depth)
+    single_time = perf_counter() - start
+
+    with ParallelSearcher(workers) as searcher:
+        searcher.search(board, side, 1)  # start worker processes before timing
+        start = perf_counter()
+        searcher.search(board, side, depth)
+        parallel_time = perf_counter() - start
+    return single_time, parallel_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare parallel and single-core search"
+    )
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--size", type=int, default=8)
+    args = parser.parse_args()
+
+    board = Board(args.size, args.size)
+    single_time, parallel_time = benchmark(
+        board, SideType.WHITE, args.depth, args.workers
+    )
+    print(f"single-core: {single_time:.3f}s")
+    print(f"{args.workers} workers: {parallel_time:.3f}s")
+    print(f"speedup: {single_time / parallel_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
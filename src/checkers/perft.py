@@ -0,0 +1,80 @@
+import sys
+import argparse
+from time import perf_counter
+from typing import Dict, Tuple
+
+from .side import SideType
+from .board import Board
+
+# Leaf counts from the starting position with white to move, by (x_size, y_size)
+REFERENCE_COUNTS: Dict[Tuple[int, int], Tuple[int, ...]] = {
+    (8, 8): (7, 49, 302, 1469, 7482, 37986, 190146, 929984),
+    (10, 10): (9, 81, 810, 8100, 88900, 957965),
+}
+
+
+def perft(board: Board, side: SideType, depth: int) -> int:
+    if depth <= 0:
+        return 1
+    sequences = list(board.get_move_sequences(side))
+    if depth == 1:
+        return len(sequences)
+    nodes = 0
+    for sequence in sequences:
+        undo = board.make_sequence(sequence)
+        nodes += perft(board, SideType.opposite(side), depth - 1)
+        board.unmake_move(undo)
+    return nodes
+
+
+def benchmark(x_size: int, y_size: int, depth: int, repeat: int) -> float:
+    board = Board(x_size, y_size)
+    nodes = 0
+    start = perf_counter()
+    for _ in range(repeat):
+        nodes += perft(board, SideType.WHITE, depth)
+    return nodes / (perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Count move generation leaf nodes")
+    parser.add_argument("--x-size", type=int, default=8)
+    parser.add_argument("--y-size", type=int, default=8)
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument(
+        "--verify", action="store_true", help="compare counts with the reference ones"
+    )
+    parser.add_argument(
+        "--benchmark", action="store_true", help="measure nodes per second at --depth"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--min-nps", type=float, default=0, help="fail benchmark below this speed"
+    )
+    args = parser.parse_args()
+
+    if args.benchmark:
+        nps = benchmark(args.x_size, args.y_size, args.depth, args.repeat)
+        print(f"{nps:.0f} nodes/s")
+        sys.exit(int(nps < args.min_nps))
+
+    reference = REFERENCE_COUNTS.get((args.x_size, args.y_size), ())
+    failed = False
+    board = Board(args.x_size, args.y_size)
+    for depth in range(1, args.depth + 1):
+        start = perf_counter()
+        nodes = perft(board, SideType.WHITE, depth)
+        elapsed = perf_counter() - start
+        line = (
+            f"depth {depth}: {nodes} nodes, {elapsed:.3f}s, {nodes / elapsed:.0f} nodes/s"
+        )
+        if args.verify and depth <= len(reference):
+            expected = reference[depth - 1]
+            failed = failed or nodes != expected
+            line += " ok" if nodes == expected else f" expected {expected}"
+        print(line)
+    sys.exit(int(failed))
+
+
+if __name__ == "__main__":
+    main()
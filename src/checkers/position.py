@@ -1,23 +1,9 @@
-from typing import Tuple
+from typing import Tuple, NamedTuple
 
 
-class Position:
-    def __init__(self, x: int = -1, y: int = -1) -> None:
-        self.__x = x
-        self.__y = y
-
-    def __eq__(self, value: object) -> bool:
-        if not isinstance(value, Position):
-            return NotImplemented
-        return self.x == value.x and self.y == value.y
-
-    @property
-    def x(self) -> int:
-        return self.__x
-
-    @property
-    def y(self) -> int:
-        return self.__y
+class Position(NamedTuple):
+    x: int = -1
+    y: int = -1
 
 
 # Possible move offsets for checkers
@@ -0,0 +1,140 @@
+import os
+import json
+import random
+import argparse
+from time import perf_counter
+from typing import Any, Dict, List, TextIO, Iterator, Optional, NamedTuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .side import SideType
+from .board import Board
+from .search import Searcher
+from .transposition import TranspositionTable
+
+
+class GameSettings(NamedTuple):
+    x_size: int = 8
+    y_size: int = 8
+    white_depth: int = 3
+    black_depth: int = 3
+    time_ms: Optional[int] = None  # per move, on top of the depth limit
+    max_turns: int = 200  # draw when the game is not over sooner, see Board.is_draw
+    table_size: int = 16  # in MB, for each side
+
+
+def play_game(settings: GameSettings, seed: int) -> Dict[str, Any]:
+    random.seed(seed)
+    board = Board(settings.x_size, settings.y_size)
+    searchers = {
+        side: Searcher(board, TranspositionTable(settings.table_size))
+        for side in SideType
+    }
+    depths = {SideType.WHITE: settings.white_depth, SideType.BLACK: settings.black_depth}
+
+    moves: List[Dict[str, Any]] = []
+    winner: Optional[SideType] = None
+    side = SideType.WHITE
+    start = perf_counter()
+    for _ in range(settings.max_turns):
+        move_start = perf_counter()
+        board.record_position(side)
+        if board.is_draw:
+            break
+        result = searchers[side].search(side, depths[side], settings.time_ms)
+        if not result.moves:
+            winner = SideType.opposite(side)
+            break
+        for move in result.moves:
+            board.handle_move(move)
+        path = [result.moves[0].from_] + [move.to for move in result.moves]
+        moves.append(
+            {
+                "side": side.name,
+                "path": [[position.x, position.y] for position in path],
+                "score": result.score,
+                "depth": result.depth,
+                "nodes": result.nodes,
+                "time_ms": round((perf_counter() - move_start) * 1000, 3),
+            }
+        )
+        side = SideType.opposite(side)
+
+    return {
+        "seed": seed,
+        "settings": settings._asdict(),
+        "winner": None if winner is None else winner.name,
+        "turns": len(moves),
+        "nodes": sum(move["nodes"] for move in moves),
+        "time_ms": round((perf_counter() - start) * 1000, 3),
+        "moves": moves,
+    }
+
+
+class GameRunner:
+    def __init__(self, settings: GameSettings, workers: Optional[int] = None) -> None:
+        self.__settings = settings
+        self.__workers = workers or os.cpu_count() or 1
+
+    @property
+    def settings(self) -> GameSettings:
+        return self.__settings
+
+    @property
+    def workers(self) -> int:
+        return self.__workers
+
+    def run(self, games: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+        # Games are yielded in order of completion
+        with ProcessPoolExecutor(self.__workers) as executor:
+            futures = [
+                executor.submit(play_game, self.__settings, seed + game)
+                for game in range(games)
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def run_to_file(self, games: int, output: TextIO, seed: int = 0) -> Dict[str, int]:
+        outcomes = {side.name: 0 for side in SideType} | {"DRAW": 0}
+        for game in self.run(games, seed):
+            output.write(json.dumps(game) + "\n")
+            output.flush()
+            outcomes[game["winner"] or "DRAW"] += 1
+        return outcomes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Play engine against engine games")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", default="games.jsonl")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--size", type=int, default=8)
+    parser.add_argument("--depth", type=int, default=3, help="depth of both sides")
+    parser.add_argument("--white-depth", type=int)
+    parser.add_argument("--black-depth", type=int)
+    parser.add_argument("--time-ms", type=int)
+    parser.add_argument("--max-turns", type=int, default=200)
+    args = parser.parse_args()
+
+    settings = GameSettings(
+        x_size=args.size,
+        y_size=args.size,
+        white_depth=args.white_depth or args.depth,
+        black_depth=args.black_depth or args.depth,
+        time_ms=args.time_ms,
+        max_turns=args.max_turns,
+    )
+    start = perf_counter()
+    with open(args.output, "w") as output:
+        outcomes = GameRunner(settings, args.workers).run_to_file(
+            args.games, output, args.seed
+        )
+    elapsed = perf_counter() - start
+    print(
+        ", ".join(f"{name}: {count}" for name, count in outcomes.items())
+        + f" in {elapsed:.1f}s ({args.games / elapsed * 3600:.0f} games/hour)"
+    )
+
+
+if __name__ == "__main__":
+    main()
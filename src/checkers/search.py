@@ -0,0 +1,382 @@
+from time import perf_counter
+from random import shuffle
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Set,
+    Dict,
+    List,
+    Tuple,
+    Callable,
+    Optional,
+    NamedTuple,
+)
+from threading import Event
+
+from .move import Move, UndoInfo, MoveSequence
+from .side import SideType
+from .position import Position
+from .evaluation import Evaluator, PieceSquareEvaluator
+from .transposition import Bound, TableEntry, TranspositionTable
+
+if TYPE_CHECKING:
+    from .board import Board
+    from .tablebase import Tablebase
+
+# Score of a won position, wins found sooner score higher
+WIN_SCORE: int = 100_000
+# Wins further than this number of plies from the root are not expected
+MAX_PLY: int = 1_000
+# Number of nodes between two checks of time and nodes budget
+CHECK_INTERVAL: int = 256
+# Number of quiet moves which caused a beta cutoff kept for every ply
+KILLER_SLOTS: int = 2
+# Score of a position which occurred before in the game or the searched line
+DRAW_SCORE: int = 0
+
+
+class SearchStats(NamedTuple):
+    depth: int  # depth of the iteration
+    max_ply: int  # deepest searched node from the root
+    nodes: int
+    time_ms: float
+    nodes_per_second: float
+    # Time spent in every phase, in ms
+    move_generation_ms: float
+    evaluation_ms: float
+    make_unmake_ms: float
+    table_probes: int
+    table_hits: int
+    cutoffs: int
+    first_move_cutoffs: int
+
+
+class SearchResult(NamedTuple):
+    moves: List[Move]
+    score: int
+    depth: int  # depth of the last fully searched iteration
+    nodes: int
+    sequence: Optional[MoveSequence] = None
+    cutoffs: int = 0  # number of beta cutoffs
+    first_move_cutoffs: int = 0  # number of beta cutoffs by the first searched move
+    stats: Optional[SearchStats] = None  # only when collected, as of the result depth
+
+
+class Searcher:
+    def __init__(
+        self,
+        board: "Board",
+        table: Optional[TranspositionTable] = None,
+        evaluator: Optional[Evaluator] = None,
+        tablebase: Optional["Tablebase"] = None,
+    ) -> None:
+        self.__board = board
+        self.__table = TranspositionTable() if table is None else table
+        self.__evaluator = PieceSquareEvaluator() if evaluator is None else evaluator
+        self.__tablebase = tablebase
+        self.__nodes = 0
+        self.__deadline: Optional[float] = None
+        self.__max_nodes: Optional[int] = None
+        self.__stop: Optional[Event] = None
+        self.__stopped = False
+        self.__can_stop = False
+        # Move ordering state, kept between iterations of one search
+        self.__killers: List[List[MoveSequence]] = []
+        self.__history: Dict[Tuple[SideType, Position, Position], int] = {}
+        self.__cutoffs = 0
+        self.__first_move_cutoffs = 0
+        # Positions of the game history and of the searched line, repeating any of them
+        # is scored as a draw without searching further
+        self.__seen: Set[int] = set()
+        # Statistics, time of the phases is measured only when stats are collected
+        self.__start = 0.0
+        self.__max_ply = 0
+        self.__table_probes = 0
+        self.__table_hits = 0
+        self.__set_profiling(False)
+
+    def search(
+        self,
+        side: SideType,
+        max_depth: int,
+        time_ms: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        root_sequences: Optional[List[MoveSequence]] = None,
+        stop: Optional[Event] = None,
+        stats: bool = False,
+        on_iteration: Optional[Callable[[SearchResult], None]] = None,
+    ) -> SearchResult:
+        # Setting the stop event cancels the search, even before the first iteration.
+        # With stats or an iteration callback results carry SearchStats.
+        self.__start = perf_counter()
+        self.__nodes = 0
+        self.__deadline = None if time_ms is None else perf_counter() + time_ms / 1000
+        self.__max_nodes = max_nodes
+        self.__stop = stop
+        self.__stopped = False
+        self.__can_stop = False
+        self.__killers = [[] for _ in range(max(max_depth, 1) + 1)]
+        self.__history = {}
+        self.__cutoffs = 0
+        self.__first_move_cutoffs = 0
+        self.__seen = {*self.__board.history, self.__board.position_hash(side)}
+        self.__max_ply = 0
+        self.__table_probes = 0
+        self.__table_hits = 0
+        self.__set_profiling(stats or on_iteration is not None)
+
+        if root_sequences is None:
+            sequences = list(self.__board.get_move_sequences(side))
+        else:
+            sequences = list(root_sequences)
+        if not sequences:
+            return SearchResult([], -WIN_SCORE, 0, 0)
+        shuffle(sequences)  # random choice between equally good moves
+        self.__order_hash_move(sequences, self.__board.position_hash(side))
+
+        result = SearchResult(sequences[0].moves, 0, 0, 0, sequences[0])
+        for depth in range(1, max(max_depth, 1) + 1):
+            best_sequence: Optional[MoveSequence] = None
+            alpha = -WIN_SCORE - 1
+            for sequence in sequences:
+                undo = self.__make(sequence)
+                score = -self.__negamax(
+                    SideType.opposite(side), depth - 1, -WIN_SCORE - 1, -alpha, 1
+                )
+                self.__unmake(undo)
+                if self.__stopped:
+                    break
+                if score > alpha:
+                    alpha = score
+                    best_sequence = sequence
+            if self.__stopped or best_sequence is None:
+                break
+
+            result = SearchResult(
+                best_sequence.moves,
+                alpha,
+                depth,
+                self.__nodes,
+                best_sequence,
+                self.__cutoffs,
+                self.__first_move_cutoffs,
+                self.__get_stats(depth) if self.__timings else None,
+            )
+            if on_iteration is not None:
+                on_iteration(result)
+            self.__table.store(
+                self.__board.position_hash(side), depth, alpha, Bound.EXACT, best_sequence
+            )
+            self.__can_stop = True
+            # search the best move of this iteration first on the next one
+            sequences.remove(best_sequence)
+            sequences.insert(0, best_sequence)
+            if abs(alpha) >= WIN_SCORE - depth:
+                break
+        return result._replace(
+            nodes=self.__nodes,
+            cutoffs=self.__cutoffs,
+            first_move_cutoffs=self.__first_move_cutoffs,
+        )
+
+    def __set_profiling(self, enabled: bool) -> None:
+        # Phases are called through these attributes, which are wrapped with timers
+        # only when profiling, so disabled stats cost nothing
+        board = self.__board
+        self.__timings: Dict[str, float] = {}
+        self.__generate: Callable[[SideType], Any] = board.get_move_sequences
+        self.__evaluate: Callable[["Board", SideType], int] = self.__evaluator.evaluate
+        self.__make: Callable[[MoveSequence], UndoInfo] = board.make_sequence
+        self.__unmake: Callable[[UndoInfo], None] = board.unmake_move
+        if not enabled:
+            return
+
+        timings = self.__timings = {
+            "move_generation": 0.0,
+            "evaluation": 0.0,
+            "make_unmake": 0.0,
+        }
+
+        def timed(function: Callable[..., Any], phase: str) -> Callable[..., Any]:
+            def measure(*args: Any) -> Any:
+                start = perf_counter()
+                result = function(*args)
+                timings[phase] += perf_counter() - start
+                return result
+
+            return measure
+
+        self.__generate = timed(
+            lambda side: list(board.get_move_sequences(side)), "move_generation"
+        )
+        self.__evaluate = timed(self.__evaluator.evaluate, "evaluation")
+        self.__make = timed(board.make_sequence, "make_unmake")
+        self.__unmake = timed(board.unmake_move, "make_unmake")
+
+    def __get_stats(self, depth: int) -> SearchStats:
+        time = perf_counter() - self.__start
+        return SearchStats(
+            depth,
+            self.__max_ply,
+            self.__nodes,
+            time * 1000,
+            self.__nodes / time if time > 0 else 0.0,
+            self.__timings["move_generation"] * 1000,
+            self.__timings["evaluation"] * 1000,
+            self.__timings["make_unmake"] * 1000,
+            self.__table_probes,
+            self.__table_hits,
+            self.__cutoffs,
+            self.__first_move_cutoffs,
+        )
+
+    def __negamax(
+        self, side: SideType, depth: int, alpha: int, beta: int, ply: int
+    ) -> int:
+        self.__nodes += 1
+        if ply > self.__max_ply:
+            self.__max_ply = ply
+        if not self.__nodes % CHECK_INTERVAL and self.__is_out_of_budget():
+            self.__stopped = True
+            return 0
+
+        key = self.__board.position_hash(side)
+        if key in self.__seen:
+            return DRAW_SCORE
+        entry = self.__table.probe(key)
+        self.__table_probes += 1
+        if entry is not None:
+            self.__table_hits += 1
+        if entry is not None and entry.depth >= depth:
+            score = self.__from_table(entry.score, ply)
+            if (
+                entry.bound == Bound.EXACT
+                or (entry.bound == Bound.LOWER and score >= beta)
+                or (entry.bound == Bound.UPPER and score <= alpha)
+            ):
+                return score
+
+        if self.__tablebase is not None:
+            outcome = self.__tablebase.probe(self.__board, side)
+            if outcome is not None:
+                result, distance = outcome
+                return result * (WIN_SCORE - ply - distance)
+
+        sequences = list(self.__generate(side))
+        if not sequences:
+            return -WIN_SCORE + ply
+        if depth <= 0:
+            return self.__evaluate(self.__board, side)
+        self.__order_moves(sequences, side, ply, entry)
+
+        original_alpha = alpha
+        best = -WIN_SCORE - 1
+        best_sequence: Optional[MoveSequence] = None
+        self.__seen.add(key)
+        for i, sequence in enumerate(sequences):
+            undo = self.__make(sequence)
+            score = -self.__negamax(
+                SideType.opposite(side), depth - 1, -beta, -alpha, ply + 1
+            )
+            self.__unmake(undo)
+            if self.__stopped:
+                self.__seen.discard(key)
+                return 0
+            if score > best:
+                best = score
+                best_sequence = sequence
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self.__handle_cutoff(sequence, side, depth, ply, i)
+                        break
+        self.__seen.discard(key)
+
+        if best <= original_alpha:
+            bound = Bound.UPPER
+        elif best >= beta:
+            bound = Bound.LOWER
+        else:
+            bound = Bound.EXACT
+        self.__table.store(key, depth, self.__to_table(best, ply), bound, best_sequence)
+        return best
+
+    def __is_out_of_budget(self) -> bool:
+        if self.__stop is not None and self.__stop.is_set():
+            return True
+        if not self.__can_stop:
+            return False
+        if self.__max_nodes is not None and self.__nodes >= self.__max_nodes:
+            return True
+        return self.__deadline is not None and perf_counter() >= self.__deadline
+
+    def __order_moves(
+        self,
+        sequences: List[MoveSequence],
+        side: SideType,
+        ply: int,
+        entry: Optional[TableEntry],
+    ) -> None:
+        # Hash move, then longer captures, promotions, killer moves and moves with
+        # the highest history score
+        hash_sequence = None if entry is None else entry.sequence
+        killers = self.__killers[ply]
+        history = self.__history
+        if side == SideType.WHITE:
+            men, promotion_row = self.__board.bitboard.white_men, 0
+        else:
+            men, promotion_row = self.__board.bitboard.black_men, self.__board.y_size - 1
+        x_size = self.__board.x_size
+
+        def priority(sequence: MoveSequence) -> Tuple[bool, int, bool, bool, int]:
+            from_, to = sequence.path[0], sequence.path[-1]
+            return (
+                sequence == hash_sequence,
+                len(sequence.captured),
+                bool(men >> from_.y * x_size + from_.x & 1)
+                and any(position.y == promotion_row for position in sequence.path),
+                sequence in killers,
+                history.get((side, from_, to), 0),
+            )
+
+        sequences.sort(key=priority, reverse=True)
+
+    def __handle_cutoff(
+        self, sequence: MoveSequence, side: SideType, depth: int, ply: int, index: int
+    ) -> None:
+        self.__cutoffs += 1
+        if index == 0:
+            self.__first_move_cutoffs += 1
+        if sequence.captured:
+            return
+        killers = self.__killers[ply]
+        if sequence not in killers:
+            killers.insert(0, sequence)
+            del killers[KILLER_SLOTS:]
+        key = (side, sequence.path[0], sequence.path[-1])
+        self.__history[key] = self.__history.get(key, 0) + depth * depth
+
+    def __order_hash_move(self, sequences: List[MoveSequence], key: int) -> None:
+        entry = self.__table.probe(key)
+        if (
+            entry is not None
+            and entry.sequence is not None
+            and entry.sequence in sequences
+        ):
+            sequences.remove(entry.sequence)
+            sequences.insert(0, entry.sequence)
+
+    def __to_table(self, score: int, ply: int) -> int:
+        # Wins are stored as distance from the node instead of from the root
+        if score >= WIN_SCORE - MAX_PLY:
+            return score + ply
+        elif score <= -WIN_SCORE + MAX_PLY:
+            return score - ply
+        return score
+
+    def __from_table(self, score: int, ply: int) -> int:
+        if score >= WIN_SCORE - MAX_PLY:
+            return score - ply
+        elif score <= -WIN_SCORE + MAX_PLY:
+            return score + ply
+        return score
@@ -0,0 +1,217 @@
+import os
+import json
+import time
+import zlib
+import asyncio
+import argparse
+import multiprocessing
+from typing import Any, Dict, List, Tuple, Optional
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from .side import SideType
+from .board import Board
+from .codec import from_fen, decode_position
+from .search import Searcher
+from .transposition import TranspositionTable
+
+DEFAULT_PORT: int = 8765
+DEFAULT_QUEUE_SIZE: int = 64  # requests waiting for a worker, more are refused
+DEFAULT_TIMEOUT_MS: int = 10_000
+# Part of the request timeout left for dispatch, the budget checks of the search and
+# sending the result back, the search gets the rest
+TIMEOUT_MARGIN_MS: int = 100
+MAX_DEPTH: int = 64
+BOARD_SIZES: range = range(4, 17)  # sides of boards whose tables workers may build
+SESSION_TABLE_SIZE: int = 8  # in MB, for every session
+SESSIONS_PER_WORKER: int = 8  # tables of least recently used sessions are dropped
+
+# Transposition tables of sessions pinned to this worker process
+_tables: OrderedDict[str, TranspositionTable] = OrderedDict()
+
+
+def _check_request(request: Dict[str, Any]) -> None:
+    # Raises ValueError for requests which would fail in a worker
+    limits = {
+        "depth": range(1, MAX_DEPTH + 1),
+        "x_size": BOARD_SIZES,
+        "y_size": BOARD_SIZES,
+        "time_ms": range(1, 2**31),
+        "timeout_ms": range(1, 2**31),
+        "max_nodes": range(1, 2**63),
+    }
+    for field, limit in limits.items():
+        value = request.get(field, limit.start)
+        if not isinstance(value, int) or isinstance(value, bool) or value not in limit:
+            raise ValueError(
+                f"{field} must be an integer in [{limit.start}, {limit.stop})"
+            )
+    for field in ("fen", "position", "session"):
+        if not isinstance(request.get(field, ""), str):
+            raise ValueError(f"{field} must be a string")
+    if "fen" not in request and "position" not in request:
+        raise ValueError("fen or position is required")
+    if request.get("side", SideType.WHITE.name) not in SideType.__members__:
+        raise ValueError("side must be WHITE or BLACK")
+
+
+def _decode_request(request: Dict[str, Any]) -> Tuple[Board, SideType]:
+    # Raises ValueError for positions which do not decode
+    x_size, y_size = request.get("x_size", 8), request.get("y_size", 8)
+    if "fen" in request:
+        return from_fen(request["fen"], x_size, y_size)
+    board, side = decode_position(bytes.fromhex(request["position"]), x_size, y_size)
+    return board, SideType[request["side"]] if "side" in request else side
+
+
+def _search(
+    board: Board, side: SideType, request: Dict[str, Any], session: str, deadline: float
+) -> Dict[str, Any]:
+    # Runs in a worker process, every session keeps its table warm between requests.
+    # Search stops deepening at the wall clock deadline, after any time in the queue.
+    table = _tables.pop(session, None)
+    if table is None:
+        table = TranspositionTable(SESSION_TABLE_SIZE)
+    _tables[session] = table
+    if len(_tables) > SESSIONS_PER_WORKER:
+        _tables.popitem(last=False)
+
+    time_ms = max(0, int((deadline - time.time()) * 1000))
+    time_ms = min(request.get("time_ms", time_ms), time_ms)
+    result = Searcher(board, table).search(
+        side, request.get("depth", 6), time_ms, request.get("max_nodes")
+    )
+    path = [] if result.sequence is None else result.sequence.path
+    return {
+        "side": side.name,
+        "path": [[position.x, position.y] for position in path],
+        "score": result.score,
+        "depth": result.depth,
+        "nodes": result.nodes,
+    }
+
+
+class EngineServer:
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        timeout_ms: int = DEFAULT_TIMEOUT_MS,
+    ) -> None:
+        # Every worker is a process of its own, so a session always lands on the
+        # worker with its table. Workers are spawned, forked ones would keep sockets
+        # of connections open after clients close them
+        self.__workers = workers or os.cpu_count() or 1
+        context = multiprocessing.get_context("spawn")
+        self.__executors = [
+            ProcessPoolExecutor(1, mp_context=context) for _ in range(self.__workers)
+        ]
+        self.__queue_size = queue_size
+        self.__timeout_ms = timeout_ms
+        self.__pending = 0
+
+    @property
+    def workers(self) -> int:
+        return self.__workers
+
+    @property
+    def pending(self) -> int:
+        return self.__pending
+
+    def shutdown(self) -> None:
+        for executor in self.__executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def handle(self, request: Dict[str, Any], session: str) -> Dict[str, Any]:
+        response: Dict[str, Any] = {"id": request.get("id")}
+        try:
+            _check_request(request)
+            board, side = _decode_request(request)
+        except ValueError as error:
+            return response | {"error": f"bad request: {error}"}
+        if self.__pending >= self.__queue_size:
+            return response | {"error": "busy"}
+
+        # Search stops on its own before the request times out
+        timeout_ms = min(request.get("timeout_ms", self.__timeout_ms), self.__timeout_ms)
+        deadline = time.time() + (timeout_ms - TIMEOUT_MARGIN_MS) / 1000
+        session = request.get("session", session)
+        executor = self.__executors[zlib.crc32(session.encode()) % self.__workers]
+        self.__pending += 1
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                executor, _search, board, side, request, session, deadline
+            )
+            return response | await asyncio.wait_for(future, timeout_ms / 1000)
+        except TimeoutError:
+            return response | {"error": "timeout"}
+        finally:
+            self.__pending -= 1
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await asyncio.start_server(self.__handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def __handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        # One JSON request per line, requests of a connection are handled concurrently
+        # and answered in order of completion with their id
+        session = str(writer.get_extra_info("peername"))
+        lock = asyncio.Lock()
+        tasks: List[asyncio.Task[None]] = []
+
+        async def respond(line: bytes) -> None:
+            # Errors are answered, so one request can not close the connection
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("not an object")
+            except ValueError as error:
+                response = {"id": None, "error": f"bad request: {error}"}
+            else:
+                try:
+                    response = await self.handle(request, session)
+                except Exception as error:
+                    response = {
+                        "id": request.get("id"),
+                        "error": f"internal error: {error!r}",
+                    }
+            async with lock:
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    tasks.append(asyncio.create_task(respond(line)))
+            await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the engine over line JSON TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE)
+    parser.add_argument("--timeout-ms", type=int, default=DEFAULT_TIMEOUT_MS)
+    args = parser.parse_args()
+
+    server = EngineServer(args.workers, args.queue_size, args.timeout_ms)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
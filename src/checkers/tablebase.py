@@ -0,0 +1,343 @@
+import sys
+import mmap
+import struct
+import argparse
+from math import comb, prod
+from time import perf_counter
+from typing import TYPE_CHECKING, Dict, List, Tuple, Iterator, Optional
+from pathlib import Path
+from itertools import product, combinations
+
+from .side import SideType
+from .tables import get_board_tables
+from .bitboard import BitBoard, iter_bits
+
+if TYPE_CHECKING:
+    from .board import Board
+
+# Header is magic, version, x_size, y_size, max pieces and number of material classes
+HEADER = struct.Struct("<4sHBBBI")
+# Directory entry is white men, white kings, black men, black kings and data offset
+CLASS = struct.Struct("<BBBBQ")
+MAGIC: bytes = b"CKTB"
+VERSION: int = 1
+DEFAULT_MAX_PIECES: int = 3
+# Value byte of a position is 0 for a draw, distance in plies to the win for a won
+# position and LOSS_FLAG | distance in plies to the loss for a lost one
+LOSS_FLAG: int = 0x80
+MAX_DISTANCE: int = 0x7F
+
+# Number of white men, white kings, black men and black kings
+Material = Tuple[int, int, int, int]
+# Masks of white men, white kings, black men and black kings
+Masks = Tuple[int, int, int, int]
+
+
+def encode(result: int, distance: int) -> int:
+    if result == 0:
+        return 0
+    distance = min(distance, MAX_DISTANCE)
+    return distance if result > 0 else LOSS_FLAG | distance
+
+
+def decode(value: int) -> Tuple[int, int]:
+    # (1 for a win, -1 for a loss and 0 for a draw, distance in plies)
+    if value == 0:
+        return 0, 0
+    if value & LOSS_FLAG:
+        return -1, value & MAX_DISTANCE
+    return 1, value
+
+
+def material_of(masks: Masks) -> Material:
+    white_men, white_kings, black_men, black_kings = masks
+    return (
+        white_men.bit_count(),
+        white_kings.bit_count(),
+        black_men.bit_count(),
+        black_kings.bit_count(),
+    )
+
+
+def class_size(material: Material, squares: int) -> int:
+    return prod(comb(squares, count) for count in material) * 2
+
+
+def position_index(
+    material: Material, masks: Masks, side: SideType, ordinals: Dict[int, int]
+) -> int:
+    # Every checker type is a combination of dark squares ranked in combinatorial
+    # number system, side to move is the lowest digit
+    squares = len(ordinals)
+    index = 0
+    for count, mask in zip(material, masks):
+        rank = sum(
+            comb(ordinals[square], i + 1) for i, square in enumerate(iter_bits(mask))
+        )
+        index = index * comb(squares, count) + rank
+    return index * 2 + (side == SideType.BLACK)
+
+
+def material_classes(max_pieces: int) -> List[Material]:
+    # In order of generation: a capture leads to a class with fewer checkers and a
+    # promotion to a class with fewer men
+    classes = [
+        (white_men, white_kings, black_men, black_kings)
+        for white_men, white_kings, black_men, black_kings in product(
+            range(max_pieces), repeat=4
+        )
+        if 0 < white_men + white_kings
+        and 0 < black_men + black_kings
+        and white_men + white_kings + black_men + black_kings <= max_pieces
+    ]
+    return sorted(
+        classes, key=lambda material: (sum(material), material[0] + material[2])
+    )
+
+
+class Tablebase:
+    def __init__(self, path: Path) -> None:
+        with open(path, "rb") as file:
+            self.__data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, x_size, y_size, max_pieces, count = HEADER.unpack_from(
+            self.__data
+        )
+        if magic != MAGIC or version != VERSION:
+            self.__data.close()
+            raise ValueError(f"{path} is not a tablebase")
+        self.__x_size: int = x_size
+        self.__y_size: int = y_size
+        self.__max_pieces: int = max_pieces
+        self.__ordinals = get_board_tables(x_size, y_size).ordinals
+        self.__offsets: Dict[Material, int] = {}
+        for i in range(count):
+            white_men, white_kings, black_men, black_kings, offset = CLASS.unpack_from(
+                self.__data, HEADER.size + i * CLASS.size
+            )
+            self.__offsets[(white_men, white_kings, black_men, black_kings)] = offset
+
+    def __len__(self) -> int:
+        return len(self.__offsets)
+
+    @property
+    def max_pieces(self) -> int:
+        return self.__max_pieces
+
+    def close(self) -> None:
+        self.__data.close()
+
+    def probe(self, board: "Board", side: SideType) -> Optional[Tuple[int, int]]:
+        # (result, distance) as in decode, None when the position is not in the tablebase
+        if (board.x_size, board.y_size) != (self.__x_size, self.__y_size):
+            return None
+        if board.white_checkers_count + board.black_checkers_count > self.__max_pieces:
+            return None
+        bitboard = board.bitboard
+        masks = (
+            bitboard.white_men,
+            bitboard.white_kings,
+            bitboard.black_men,
+            bitboard.black_kings,
+        )
+        material = material_of(masks)
+        offset = self.__offsets.get(material)
+        if offset is None:
+            return None
+        return decode(
+            self.__data[offset + position_index(material, masks, side, self.__ordinals)]
+        )
+
+
+class TablebaseBuilder:
+    def __init__(
+        self, x_size: int = 8, y_size: int = 8, max_pieces: int = DEFAULT_MAX_PIECES
+    ) -> None:
+        self.__x_size = x_size
+        self.__y_size = y_size
+        self.__max_pieces = max_pieces
+        self.__bitboard = BitBoard(x_size, y_size)
+        self.__ordinals = get_board_tables(x_size, y_size).ordinals
+        self.__squares = tuple(self.__ordinals)
+        self.__values: Dict[Material, bytearray] = {}
+
+    def __len__(self) -> int:
+        return sum(len(values) for values in self.__values.values())
+
+    def build(self) -> Iterator[Tuple[Material, int]]:
+        # Yields every generated class with its number of positions
+        for material in material_classes(self.__max_pieces):
+            self.__values[material] = self.__build_class(material)
+            yield material, len(self.__values[material])
+
+    def write(self, path: Path) -> None:
+        offset = HEADER.size + len(self.__values) * CLASS.size
+        with open(path, "wb") as file:
+            file.write(
+                HEADER.pack(
+                    MAGIC,
+                    VERSION,
+                    self.__x_size,
+                    self.__y_size,
+                    self.__max_pieces,
+                    len(self.__values),
+                )
+            )
+            for material, values in self.__values.items():
+                file.write(CLASS.pack(*material, offset))
+                offset += len(values)
+            for values in self.__values.values():
+                file.write(values)
+
+    def __build_class(self, material: Material) -> bytearray:
+        values = bytearray(class_size(material, len(self.__squares)))
+        # Unresolved positions with successors inside the class and values of the
+        # successors in already generated classes
+        pending: List[Tuple[int, List[int], List[int]]] = []
+        for masks in self.__positions(material):
+            for side in SideType:
+                index = position_index(material, masks, side, self.__ordinals)
+                internal, external = self.__successors(material, masks, side)
+                if not internal and not external:
+                    values[index] = encode(-1, 0)
+                else:
+                    pending.append((index, internal, external))
+
+        # Retrograde analysis by distance: a position is won in d plies when one of its
+        # successors is lost in d - 1 plies, and lost in d plies when all successors are
+        # won and the longest of them in d - 1 plies
+        resolved = bytearray(b"\x01" * len(values))
+        for index, _, _ in pending:
+            resolved[index] = 0
+        max_external = max(
+            (decode(value)[1] for _, _, external in pending for value in external),
+            default=0,
+        )
+        distance = 1
+        while pending:
+            updates: List[Tuple[int, int]] = []
+            unresolved: List[Tuple[int, List[int], List[int]]] = []
+            for position in pending:
+                index, internal, external = position
+                successors = [values[i] for i in internal if resolved[i]] + external
+                lost = [decode(value) for value in successors]
+                if (-1, distance - 1) in lost:
+                    updates.append((index, encode(1, distance)))
+                elif (
+                    len(successors) == len(internal) + len(external)
+                    and all(result > 0 for result, _ in lost)
+                    and max(d for _, d in lost) <= distance - 1
+                ):
+                    updates.append((index, encode(-1, distance)))
+                else:
+                    unresolved.append(position)
+            for index, value in updates:
+                values[index] = value
+                resolved[index] = 1
+            if not updates and distance > max_external + 1:
+                break
+            pending = unresolved
+            distance += 1
+        return values
+
+    def __positions(self, material: Material) -> Iterator[Masks]:
+        # Men never stand on the row of their promotion
+        white_promotion, black_promotion = self.__bitboard.promotion_masks
+        forbidden = (white_promotion, 0, black_promotion, 0)
+        for squares in product(
+            *(combinations(self.__squares, count) for count in material)
+        ):
+            masks = tuple(sum(1 << square for square in group) for group in squares)
+            occupied = 0
+            for mask, excluded in zip(masks, forbidden):
+                if occupied & mask or mask & excluded:
+                    break
+                occupied |= mask
+            else:
+                yield masks  # type: ignore[misc]
+
+    def __successors(
+        self, material: Material, masks: Masks, side: SideType
+    ) -> Tuple[List[int], List[int]]:
+        # Indexes of successors in the same class and values of the other successors
+        self.__bitboard.load(*masks)
+        opponent = SideType.opposite(side)
+        internal: List[int] = []
+        external: List[int] = []
+        for path, captured in self.__bitboard.sequences(side):
+            next_masks = self.__apply(masks, side, path, captured)
+            next_material = material_of(next_masks)
+            if next_material == material:
+                internal.append(
+                    position_index(material, next_masks, opponent, self.__ordinals)
+                )
+            elif not sum(
+                next_material[2:] if side == SideType.WHITE else next_material[:2]
+            ):
+                external.append(encode(-1, 0))
+            else:
+                external.append(
+                    self.__values[next_material][
+                        position_index(
+                            next_material, next_masks, opponent, self.__ordinals
+                        )
+                    ]
+                )
+        return internal, external
+
+    def __apply(
+        self,
+        masks: Masks,
+        side: SideType,
+        path: Tuple[int, ...],
+        captured: Tuple[int, ...],
+    ) -> Masks:
+        white_men, white_kings, black_men, black_kings = masks
+        from_, to = 1 << path[0], 1 << path[-1]
+        removed = sum(1 << square for square in captured)
+        promotion = self.__bitboard.promotion_masks[side == SideType.BLACK]
+        promoted = any(promotion >> square & 1 for square in path[1:])
+        if side == SideType.WHITE:
+            black_men &= ~removed
+            black_kings &= ~removed
+            if white_men & from_:
+                white_men &= ~from_
+                if promoted:
+                    white_kings |= to
+                else:
+                    white_men |= to
+            else:
+                white_kings = white_kings & ~from_ | to
+        else:
+            white_men &= ~removed
+            white_kings &= ~removed
+            if black_men & from_:
+                black_men &= ~from_
+                if promoted:
+                    black_kings |= to
+                else:
+                    black_men |= to
+            else:
+                black_kings = black_kings & ~from_ | to
+        return white_men, white_kings, black_men, black_kings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate an endgame tablebase")
+    parser.add_argument("--output", default="tablebase.bin")
+    parser.add_argument("--size", type=int, default=8)
+    parser.add_argument("--max-pieces", type=int, default=DEFAULT_MAX_PIECES)
+    args = parser.parse_args()
+
+    builder = TablebaseBuilder(args.size, args.size, args.max_pieces)
+    start = perf_counter()
+    for material, size in builder.build():
+        print(
+            f"{material}: {size} positions, {perf_counter() - start:.1f}s",
+            file=sys.stderr,
+        )
+    builder.write(Path(args.output))
+    print(f"{len(builder)} positions written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+from typing import Dict, Tuple, NamedTuple
+from functools import lru_cache
+
+from .move import Move
+from .position import MOVE_OFFSETS, Position
+
+
+class BoardTables(NamedTuple):
+    x_size: int
+    y_size: int
+    playable: int  # mask of dark squares, square index is y * x_size + x
+    positions: Tuple[Position, ...]  # position of every square index
+    moves: Dict[int, Move]  # every move along a diagonal by from * squares + to
+    # Following tables are indexed by direction in order of MOVE_OFFSETS
+    shifts: Tuple[int, ...]  # index difference of one step
+    step_sources: Tuple[int, ...]  # mask of squares which can step without leaving
+    jump_sources: Tuple[int, ...]  # mask of squares which can jump without leaving
+    # Following tables are indexed by square and then direction, -1 is out of board
+    jumps: Tuple[Tuple[Tuple[int, int], ...], ...]  # (neighbor square, landing square)
+    rays: Tuple[Tuple[Tuple[int, ...], ...], ...]  # squares up to the board edge
+    dark_squares: Tuple[int, ...]  # square index of every dark square in order
+    ordinals: Dict[int, int]  # number of the dark square by square index
+
+
+def direction(dx: int, dy: int) -> int:
+    # Index in MOVE_OFFSETS of the direction with the given signs
+    return int(dx > 0) + 2 * int(dy > 0)
+
+
+@lru_cache
+def get_board_tables(x_size: int, y_size: int) -> BoardTables:
+    def is_within(x: int, y: int) -> bool:
+        return 0 <= x < x_size and 0 <= y < y_size
+
+    def index(x: int, y: int) -> int:
+        return y * x_size + x if is_within(x, y) else -1
+
+    def sources_mask(dx: int, dy: int) -> int:
+        mask = 0
+        for y in range(y_size):
+            for x in range(x_size):
+                if is_within(x + dx, y + dy):
+                    mask |= 1 << index(x, y)
+        return mask & playable
+
+    playable = 0
+    for y in range(y_size):
+        for x in range(x_size):
+            if (y + x) % 2:
+                playable |= 1 << index(x, y)
+
+    jumps = []
+    rays = []
+    for y in range(y_size):
+        for x in range(x_size):
+            jumps.append(
+                tuple(
+                    (
+                        (
+                            index(x + offset.x, y + offset.y),
+                            index(x + 2 * offset.x, y + 2 * offset.y),
+                        )
+                        if is_within(x + 2 * offset.x, y + 2 * offset.y)
+                        else (-1, -1)
+                    )
+                    for offset in MOVE_OFFSETS
+                )
+            )
+            rays.append(
+                tuple(
+                    tuple(
+                        index(x + shift * offset.x, y + shift * offset.y)
+                        for shift in range(1, max(x_size, y_size))
+                        if is_within(x + shift * offset.x, y + shift * offset.y)
+                    )
+                    for offset in MOVE_OFFSETS
+                )
+            )
+
+    squares = x_size * y_size
+    dark_squares = tuple(square for square in range(squares) if playable >> square & 1)
+    positions = tuple(Position(x, y) for y in range(y_size) for x in range(x_size))
+    moves = {
+        from_ * squares + to: Move(positions[from_], positions[to])
+        for from_ in range(squares)
+        for ray in rays[from_]
+        for to in ray
+    }
+
+    return BoardTables(
+        x_size,
+        y_size,
+        playable,
+        positions,
+        moves,
+        tuple(offset.y * x_size + offset.x for offset in MOVE_OFFSETS),
+        tuple(sources_mask(offset.x, offset.y) for offset in MOVE_OFFSETS),
+        tuple(sources_mask(2 * offset.x, 2 * offset.y) for offset in MOVE_OFFSETS),
+        tuple(jumps),
+        tuple(rays),
+        dark_squares,
+        {square: i for i, square in enumerate(dark_squares)},
+    )
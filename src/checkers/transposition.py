@@ -0,0 +1,68 @@
+import enum
+from typing import List, Optional, NamedTuple
+
+from .move import MoveSequence
+
+# Default memory cap of a table in megabytes
+DEFAULT_TABLE_SIZE: int = 16
+# Rough size of a stored entry with its key and score objects, in bytes
+ENTRY_SIZE: int = 200
+
+
+class Bound(enum.Enum):
+    EXACT: int = enum.auto()
+    LOWER: int = enum.auto()
+    UPPER: int = enum.auto()
+
+
+class TableEntry(NamedTuple):
+    key: int
+    depth: int
+    score: int
+    bound: Bound
+    sequence: Optional[MoveSequence]  # best turn found in the position
+
+
+class TranspositionTable:
+    def __init__(self, size_mb: int = DEFAULT_TABLE_SIZE) -> None:
+        # Every bucket has a depth-preferred slot followed by an always-replace slot
+        self.__buckets = max(1, size_mb * 2**20 // (2 * ENTRY_SIZE))
+        self.__entries: List[Optional[TableEntry]] = [None] * (2 * self.__buckets)
+
+    def __len__(self) -> int:
+        return sum(entry is not None for entry in self.__entries)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.__entries)
+
+    def clear(self) -> None:
+        self.__entries = [None] * (2 * self.__buckets)
+
+    def probe(self, key: int) -> Optional[TableEntry]:
+        index = 2 * (key % self.__buckets)
+        entry = self.__entries[index]
+        if entry is not None and entry.key == key:
+            return entry
+        entry = self.__entries[index + 1]
+        if entry is not None and entry.key == key:
+            return entry
+        return None
+
+    def store(
+        self,
+        key: int,
+        depth: int,
+        score: int,
+        bound: Bound,
+        sequence: Optional[MoveSequence],
+    ) -> None:
+        index = 2 * (key % self.__buckets)
+        preferred = self.__entries[index]
+        if preferred is not None and preferred.key == key and sequence is None:
+            sequence = preferred.sequence
+        entry = TableEntry(key, depth, score, bound, sequence)
+        if preferred is None or preferred.key == key or depth >= preferred.depth:
+            self.__entries[index] = entry
+        else:
+            self.__entries[index + 1] = entry
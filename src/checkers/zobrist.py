@@ -0,0 +1,26 @@
+from random import Random
+from typing import Dict, Tuple, NamedTuple
+from functools import lru_cache
+
+from .checker import CheckerType
+
+# Fixed seed keeps hashes equal between processes and runs
+ZOBRIST_SEED: int = 0x5EED
+
+
+class ZobristKeys(NamedTuple):
+    pieces: Dict[CheckerType, Tuple[int, ...]]  # key of checker type per square index
+    black_to_move: int
+
+
+@lru_cache
+def get_zobrist_keys(x_size: int, y_size: int) -> ZobristKeys:
+    random = Random(ZOBRIST_SEED ^ (x_size << 16) ^ y_size)
+    pieces = {
+        type: tuple(
+            0 if type == CheckerType.NONE else random.getrandbits(64)
+            for _ in range(x_size * y_size)
+        )
+        for type in CheckerType
+    }
+    return ZobristKeys(pieces, random.getrandbits(64))
@@ -0,0 +1,62 @@
+import random
+from typing import List
+
+import pytest
+
+from checkers import Board, SideType, MaterialEvaluator, PieceSquareEvaluator
+
+np = pytest.importorskip("numpy")
+batch = pytest.importorskip("checkers.batch")
+
+
+def random_boards(size: int, count: int) -> List[Board]:
+    random.seed(size)
+    boards = []
+    for _ in range(count):
+        board, side = Board(size, size), SideType.WHITE
+        for _ in range(random.randint(0, 80)):
+            sequences = list(board.get_move_sequences(side))
+            if not sequences:
+                break
+            board.make_sequence(random.choice(sequences))
+            side = SideType.opposite(side)
+        boards.append(board)
+    return boards
+
+
+@pytest.mark.parametrize("size", [8, 10])
+def test_pack_round_trip(size: int) -> None:
+    boards = random_boards(size, 100)
+    array = batch.pack(boards)
+    assert array.shape == (len(boards), size, size)
+    assert [board.hash for board in batch.unpack(array)] == [
+        board.hash for board in boards
+    ]
+    for board, counts in zip(boards, batch.counts(array)):
+        assert tuple(counts) == tuple(board.counts[type] for type in batch.TYPES)
+
+
+@pytest.mark.parametrize("size", [8, 10])
+@pytest.mark.parametrize("side", list(SideType))
+def test_scores_agree_with_board(size: int, side: SideType) -> None:
+    boards = random_boards(size, 100)
+    array = batch.pack(boards)
+    material = batch.material_scores(array, side)
+    scores = batch.evaluate(array, side)
+    for i, board in enumerate(boards):
+        assert material[i] == MaterialEvaluator().evaluate(board, side)
+        assert scores[i] == PieceSquareEvaluator().evaluate(board, side)
+
+
+@pytest.mark.parametrize("size", [8, 10])
+@pytest.mark.parametrize("side", list(SideType))
+def test_captures_agree_with_board(size: int, side: SideType) -> None:
+    boards = random_boards(size, 100)
+    array = batch.pack(boards)
+    has_captures = batch.has_captures(array, side)
+    capture_masks = batch.capture_masks(array, side)
+    for i, board in enumerate(boards):
+        required = board.get_required_moves(side)
+        assert has_captures[i] == bool(required)
+        sources = {(int(x), int(y)) for y, x in zip(*np.nonzero(capture_masks[i]))}
+        assert sources == {(move.from_.x, move.from_.y) for move in required}
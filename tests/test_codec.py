@@ -0,0 +1,113 @@
+import io
+import random
+from typing import List, Optional
+
+import pytest
+
+from checkers import Board, SideType
+from checkers.codec import (
+    GameReader,
+    GameRecord,
+    GameWriter,
+    to_fen,
+    to_pdn,
+    from_fen,
+    from_pdn,
+    decode_position,
+    encode_position,
+)
+
+
+def random_record(
+    size: int, seed: int, winner: Optional[SideType], finished: bool = True
+) -> GameRecord:
+    random.seed(seed)
+    board, side = Board(size, size), SideType.WHITE
+    turns = []
+    for _ in range(40):
+        sequences = list(board.get_move_sequences(side))
+        if not sequences:
+            break
+        sequence = random.choice(sequences)
+        board.make_sequence(sequence)
+        turns.append(sequence.path)
+        side = SideType.opposite(side)
+    return GameRecord(Board(size, size), SideType.WHITE, tuple(turns), winner, finished)
+
+
+def records(size: int) -> List[GameRecord]:
+    return [
+        random_record(size, 0, SideType.WHITE),
+        random_record(size, 1, SideType.BLACK),
+        random_record(size, 2, None),
+        random_record(size, 3, None, finished=False),
+    ]
+
+
+def same(first: GameRecord, second: GameRecord) -> bool:
+    return (
+        first.board.hash == second.board.hash
+        and first.side == second.side
+        and first.turns == second.turns
+        and first.winner == second.winner
+        and first.finished == second.finished
+    )
+
+
+@pytest.mark.parametrize("size", [8, 10])
+def test_position_round_trip(size: int) -> None:
+    record = random_record(size, 0, None)
+    board, side = Board.copy(record.board), record.side
+    for path in record.turns:
+        for to_move in SideType:
+            decoded, decoded_side = decode_position(
+                encode_position(board, to_move), size, size
+            )
+            assert decoded.hash == board.hash and decoded_side == to_move
+            fen_board, fen_side = from_fen(to_fen(board, to_move), size, size)
+            assert fen_board.hash == board.hash and fen_side == to_move
+        board.make_sequence(
+            next(s for s in board.get_move_sequences(side) if s.path == path)
+        )
+        side = SideType.opposite(side)
+
+
+@pytest.mark.parametrize("size", [8, 10])
+def test_archive_round_trip(size: int) -> None:
+    file = io.BytesIO()
+    writer = GameWriter(file, size, size)
+    for record in records(size):
+        writer.write(record)
+    file.seek(0)
+    assert all(map(same, GameReader(file), records(size)))
+
+
+@pytest.mark.parametrize("size", [8, 10])
+def test_pdn_round_trip(size: int) -> None:
+    text = "\n".join(to_pdn(record) for record in records(size))
+    assert all(map(same, from_pdn(text, size, size), records(size)))
+
+
+def test_pdn_results() -> None:
+    results = {
+        "1-0": (SideType.WHITE, True),
+        "2-0": (SideType.WHITE, True),
+        "0-1": (SideType.BLACK, True),
+        "0-2": (SideType.BLACK, True),
+        "1/2-1/2": (None, True),
+        "1-1": (None, True),
+        "*": (None, False),
+    }
+    for token, expected in results.items():
+        (record,) = from_pdn(f'[Result "{token}"]\n\n1. 22-18 {token}\n')
+        assert (record.winner, record.finished) == expected
+    assert '[Result "1/2-1/2"]' in to_pdn(random_record(8, 2, None))
+    assert '[Result "*"]' in to_pdn(random_record(8, 3, None, finished=False))
+
+
+@pytest.mark.parametrize(
+    "fen", ["garbage", "X:W21:B1", "W:Q21:B1", "W:W33:B1", "W:W0:B1"]
+)
+def test_invalid_fen(fen: str) -> None:
+    with pytest.raises(ValueError):
+        from_fen(fen, 8, 8)
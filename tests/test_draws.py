@@ -0,0 +1,64 @@
+import pickle
+
+from checkers import Move, Board, Position, SideType
+from checkers.board import DRAW_TURNS, REPETITION_LIMIT
+
+
+def kings_board() -> Board:
+    # White king in the bottom left corner, black king on the top row
+    return Board.from_bitboards(8, 8, 0, 1 << 7 * 8, 0, 1 << 1)
+
+
+def shuffle(board: Board, turns: int) -> None:
+    # Kings step out and back, so every fourth turn repeats the position
+    moves = [
+        Move(Position(0, 7), Position(1, 6)),
+        Move(Position(1, 0), Position(0, 1)),
+        Move(Position(1, 6), Position(0, 7)),
+        Move(Position(0, 1), Position(1, 0)),
+    ]
+    side = SideType.WHITE
+    for turn in range(turns):
+        board.record_position(side)
+        board.handle_move(moves[turn % len(moves)])
+        side = SideType.opposite(side)
+    board.record_position(side)
+
+
+def test_threefold_repetition() -> None:
+    # Starting position occurs again after every four turns
+    board = kings_board()
+    shuffle(board, 4 * (REPETITION_LIMIT - 1) - 1)
+    assert not board.is_draw
+    board = kings_board()
+    shuffle(board, 4 * (REPETITION_LIMIT - 1))
+    assert board.is_draw
+    assert board.is_game_over() == (True, None)
+
+
+def test_turns_without_progress() -> None:
+    # Positions of the same king moves repeat, so only the length of the history counts
+    board = kings_board()
+    board.record_position(SideType.WHITE)
+    assert len(board.history) == 1
+    for _ in range(DRAW_TURNS):
+        board.record_position(SideType.WHITE)
+    assert board.is_draw
+
+
+def test_man_move_resets_history() -> None:
+    board = Board(8, 8)
+    board.record_position(SideType.WHITE)
+    board.handle_move(Move(Position(0, 5), Position(1, 4)))
+    board.record_position(SideType.BLACK)
+    assert len(board.history) == 1
+
+
+def test_history_survives_copy_and_pickle() -> None:
+    board = kings_board()
+    shuffle(board, 6)
+    for copy in (Board.copy(board), pickle.loads(pickle.dumps(board))):
+        assert copy.history == board.history
+        # Same state of the last irreversible turn, so the history is not reset
+        copy.record_position(SideType.WHITE)
+        assert copy.history == board.history + (board.history[-1],)
@@ -0,0 +1,64 @@
+import random
+from typing import Tuple
+
+import pytest
+
+from checkers import Board, SideType
+from checkers.perft import REFERENCE_COUNTS, perft
+
+# Deepest checked depth by board size, deeper counts are left to make perft
+DEPTHS = {(8, 8): 6, (10, 10): 5}
+
+
+@pytest.mark.parametrize(
+    "size, depth",
+    [
+        (size, depth)
+        for size, max_depth in DEPTHS.items()
+        for depth in range(1, max_depth + 1)
+    ],
+)
+def test_perft_matches_reference(size: Tuple[int, int], depth: int) -> None:
+    board = Board(*size)
+    assert perft(board, SideType.WHITE, depth) == REFERENCE_COUNTS[size][depth - 1]
+
+
+def snapshot(board: Board) -> Tuple[object, ...]:
+    bitboard = board.bitboard
+    return (
+        board.hash,
+        board.counts,
+        board.piece_square_score,
+        bitboard.white_men,
+        bitboard.white_kings,
+        bitboard.black_men,
+        bitboard.black_kings,
+    )
+
+
+@pytest.mark.parametrize("size", list(DEPTHS))
+def test_make_unmake_round_trip(size: Tuple[int, int]) -> None:
+    random.seed(0)
+    for _ in range(5):
+        board, side = Board(*size), SideType.WHITE
+        for _ in range(80):
+            sequences = list(board.get_move_sequences(side))
+            if not sequences:
+                break
+            before = snapshot(board)
+            for sequence in sequences:
+                undo = board.make_sequence(sequence)
+                # Incremental state matches a board built from scratch
+                bitboard = board.bitboard
+                rebuilt = Board.from_bitboards(
+                    *size,
+                    bitboard.white_men,
+                    bitboard.white_kings,
+                    bitboard.black_men,
+                    bitboard.black_kings,
+                )
+                assert snapshot(board) == snapshot(rebuilt)
+                board.unmake_move(undo)
+                assert snapshot(board) == before
+            board.make_sequence(random.choice(sequences))
+            side = SideType.opposite(side)
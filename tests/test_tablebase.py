@@ -0,0 +1,81 @@
+import random
+from typing import List, Tuple, Iterator, Optional
+from pathlib import Path
+
+import pytest
+
+from checkers import Board, SideType
+from checkers.tables import get_board_tables
+from checkers.tablebase import Tablebase, TablebaseBuilder, material_classes
+
+# Small enough to build in a few seconds, large enough for long wins
+X_SIZE, Y_SIZE, MAX_PIECES = 6, 6, 3
+
+
+@pytest.fixture(scope="module")
+def tablebase(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Tablebase]:
+    path = Path(tmp_path_factory.mktemp("tablebase"), "tablebase.bin")
+    builder = TablebaseBuilder(X_SIZE, Y_SIZE, MAX_PIECES)
+    for _ in builder.build():
+        pass
+    builder.write(path)
+    tablebase = Tablebase(path)
+    yield tablebase
+    tablebase.close()
+
+
+def random_boards(count: int) -> Iterator[Board]:
+    random.seed(0)
+    dark_squares = get_board_tables(X_SIZE, Y_SIZE).dark_squares
+    classes = material_classes(MAX_PIECES)
+    while count:
+        material = random.choice(classes)
+        squares = random.sample(dark_squares, sum(material))
+        masks: List[int] = []
+        for number in material:
+            masks.append(sum(1 << square for square in squares[:number]))
+            squares = squares[number:]
+        # Men never stand on the row of their promotion
+        if masks[0] & (1 << X_SIZE) - 1 or masks[2] >> X_SIZE * (Y_SIZE - 1):
+            continue
+        count -= 1
+        yield Board.from_bitboards(X_SIZE, Y_SIZE, *masks)
+
+
+def outcome(
+    tablebase: Tablebase, board: Board, side: SideType
+) -> Optional[Tuple[int, int]]:
+    # Side without checkers has lost, as it has no moves
+    if not (
+        board.white_checkers_count
+        if side == SideType.WHITE
+        else board.black_checkers_count
+    ):
+        return -1, 0
+    return tablebase.probe(board, side)
+
+
+def test_values_agree_with_successors(tablebase: Tablebase) -> None:
+    for board in random_boards(2000):
+        for side in SideType:
+            value = tablebase.probe(board, side)
+            assert value is not None
+            successors = []
+            for sequence in board.get_move_sequences(side):
+                undo = board.make_sequence(sequence)
+                successor = outcome(tablebase, board, SideType.opposite(side))
+                board.unmake_move(undo)
+                assert successor is not None
+                successors.append(successor)
+
+            losses = [distance for result, distance in successors if result < 0]
+            if losses:
+                expected = (1, min(losses) + 1)
+            elif all(result > 0 for result, _ in successors):
+                expected = (
+                    -1,
+                    max((distance for _, distance in successors), default=-1) + 1,
+                )
+            else:
+                expected = (0, 0)
+            assert value == expected, board